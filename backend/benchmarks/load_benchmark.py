@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Load-test the API in-process and report latency per route
+
+Boots the FastAPI app against a throwaway local mongod (or the in-memory
+mongomock-motor fake) and drives a mix of traffic modelled on the site:
+stats polls every 10s from each open SignatureForm, bursts of signatures,
+and PDF/PNG certificate downloads.
+
+Usage (from backend/, after pip install -r requirements-dev.txt):
+    python -m benchmarks.load_benchmark [--duration 30] [--pollers 200]
+        [--sign-burst 20] [--burst-interval 2] [--download-ratio 0.5]
+        [--backend auto|mongod|mock] [--mongo-url URL] [--output results.json]
+
+Prints JSON with p50/p95/p99 latency (ms), throughput and error counts per route.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Browsers re-poll stats on this interval (SignatureForm.jsx)
+STATS_POLL_SECONDS = 10
+
+
+class Recorder:
+    """Latencies and status codes per route template"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client, route: str, method: str, url: str, **kwargs):
+        # In-process transport + in-memory fake may never yield on their own;
+        # give timers and other virtual users a turn
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors[route] += 1
+            self.statuses[route]['exception'] += 1
+            return None
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        self.statuses[route][str(response.status_code)] += 1
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route in sorted(set(self.latencies) | set(self.errors)):
+            timings = sorted(self.latencies[route])
+            routes[route] = {
+                'requests': len(timings),
+                'errors': self.errors[route],
+                'statuses': dict(self.statuses[route]),
+                'throughput_rps': round(len(timings) / elapsed, 2),
+                'mean_ms': round(statistics.mean(timings), 3) if timings else None,
+                'p50_ms': _percentile(timings, 50),
+                'p95_ms': _percentile(timings, 95),
+                'p99_ms': _percentile(timings, 99),
+                'max_ms': round(timings[-1], 3) if timings else None
+            }
+        return routes
+
+
+def _percentile(sorted_values: list, percent: float):
+    if not sorted_values:
+        return None
+    index = max(int(round(len(sorted_values) * percent / 100)) - 1, 0)
+    return round(sorted_values[min(index, len(sorted_values) - 1)], 3)
+
+
+def _random_ip() -> str:
+    return f"100.{random.randint(64, 127)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
+
+
+def _random_signer() -> dict:
+    first = random.choice(['Asha', 'Ravi', 'Meera', 'Arjun', 'Kavya', 'Rohan', 'Priya', 'Vikram'])
+    last = random.choice(['Sharma', 'Verma', 'Iyer', 'Singh', 'Das', 'Khan', 'Nair', 'Gupta'])
+    return {'name': f"{first} {last}", 'phone': f"+91 9{random.randint(100000000, 999999999)}"}
+
+
+async def _sleep_before(deadline: float, seconds: float) -> bool:
+    """Sleep up to seconds, but not past deadline; False once time is up"""
+    await asyncio.sleep(max(min(seconds, deadline - time.monotonic()), 0))
+    return time.monotonic() < deadline
+
+
+async def poller(client, recorder: Recorder, deadline: float):
+    """One open petition page: stats now, then every STATS_POLL_SECONDS"""
+    # Page loads are spread over the first poll interval
+    if not await _sleep_before(deadline, random.uniform(0, STATS_POLL_SECONDS)):
+        return
+    headers = {'X-Forwarded-For': _random_ip()}
+    while True:
+        await recorder.request(client, 'GET /api/petition/stats', 'GET', '/api/petition/stats', headers=headers)
+        if not await _sleep_before(deadline, STATS_POLL_SECONDS):
+            return
+
+
+async def signer(client, recorder: Recorder, deadline: float, burst: int, interval: float, download_ratio: float):
+    """Bursts of concurrent signatures, each from its own client address
+
+    Like on the site, some signers then download their PDF and/or PNG.
+    """
+    async def sign_once():
+        headers = {'X-Forwarded-For': _random_ip()}
+        response = await recorder.request(
+            client, 'POST /api/petition/sign', 'POST', '/api/petition/sign',
+            json=_random_signer(), headers=headers
+        )
+        if response is None or response.status_code != 200:
+            return
+
+        signature_id = response.json()['id']
+        for fmt in ('pdf', 'image'):
+            if random.random() < download_ratio:
+                await recorder.request(
+                    client, f'GET /api/petition/download-{fmt}/{{id}}', 'GET',
+                    f'/api/petition/download-{fmt}/{signature_id}', headers=headers
+                )
+
+    while time.monotonic() < deadline:
+        burst_started = time.monotonic()
+        await asyncio.gather(*(sign_once() for _ in range(burst)))
+        await _sleep_before(deadline, interval - (time.monotonic() - burst_started))
+
+
+def _start_mongod():
+    """Throwaway mongod on a free port; returns (process, url, data dir)"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    data_dir = tempfile.mkdtemp(prefix='petition-bench-')
+    process = subprocess.Popen(
+        ['mongod', '--dbpath', data_dir, '--port', str(port), '--bind_ip', '127.0.0.1', '--quiet'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return process, f"mongodb://127.0.0.1:{port}", data_dir
+
+
+async def run(args) -> dict:
+    backend = args.backend
+    if backend == 'auto':
+        backend = 'mongod' if (args.mongo_url or shutil.which('mongod')) else 'mock'
+
+    mongod = data_dir = None
+    if backend == 'mongod' and not args.mongo_url:
+        mongod, args.mongo_url, data_dir = _start_mongod()
+
+    # Must be set before the app (and its module-level config) is imported
+    os.environ['MONGO_URL'] = args.mongo_url or 'mongodb://localhost:27017'
+    os.environ['DB_NAME'] = f"petition_bench_{os.getpid()}"
+    os.environ['MONGO_TLS'] = 'false'
+    os.environ['RATE_LIMIT_TRUSTED_PROXIES'] = '*'
+    os.environ.setdefault('RENDER_WORKERS', str(args.render_workers))
+    os.environ['ARTIFACT_CACHE_DIR'] = tempfile.mkdtemp(prefix='petition-bench-artifacts-')
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    import server
+    from services.database import database
+
+    # One log line per request would dominate the run
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    if backend == 'mock':
+        from mongomock_motor import AsyncMongoMockClient
+        database.client = AsyncMongoMockClient()
+        database.db = database.client[os.environ['DB_NAME']]
+
+    await server.startup_event()
+    recorder = Recorder()
+    try:
+        transport = httpx.ASGITransport(app=server.app, client=('10.0.0.1', 4321))
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as client:
+            started = time.monotonic()
+            deadline = started + args.duration
+            tasks = [poller(client, recorder, deadline) for _ in range(args.pollers)]
+            tasks.append(signer(client, recorder, deadline, args.sign_burst, args.burst_interval, args.download_ratio))
+            await asyncio.gather(*tasks)
+            elapsed = time.monotonic() - started
+    finally:
+        if backend != 'mock':
+            await database.client.drop_database(os.environ['DB_NAME'])
+        await server.shutdown_db_client()
+        if mongod is not None:
+            mongod.terminate()
+            mongod.wait()
+            shutil.rmtree(data_dir, ignore_errors=True)
+        shutil.rmtree(os.environ['ARTIFACT_CACHE_DIR'], ignore_errors=True)
+
+    return {
+        'backend': backend,
+        'duration_seconds': round(elapsed, 2),
+        # Requests still in flight at the deadline are waited for
+        'overrun_seconds': round(max(elapsed - args.duration, 0), 2),
+        'config': {
+            'pollers': args.pollers,
+            'sign_burst': args.sign_burst,
+            'burst_interval_seconds': args.burst_interval,
+            'download_ratio': args.download_ratio,
+            'render_workers': int(os.environ['RENDER_WORKERS'])
+        },
+        'routes': recorder.summary(elapsed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=30, help="seconds of traffic")
+    parser.add_argument('--pollers', type=int, default=200, help="open petition pages polling stats")
+    parser.add_argument('--sign-burst', type=int, default=20, help="concurrent signatures per burst")
+    parser.add_argument('--burst-interval', type=float, default=2, help="seconds between sign bursts")
+    parser.add_argument('--download-ratio', type=float, default=0.5, help="share of signers downloading each certificate format")
+    parser.add_argument('--render-workers', type=int, default=2)
+    parser.add_argument('--backend', choices=['auto', 'mongod', 'mock'], default='auto')
+    parser.add_argument('--mongo-url', help="use this MongoDB instead of starting one (a scratch database is created and dropped)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = asyncio.run(run(args))
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        Path(args.output).write_text(report + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Measure per-check overhead of each rate limit backend
+
+Usage (from backend/):
+    python -m benchmarks.rate_limit_benchmark [--iterations 20000] [--mongo-url mongodb://localhost:27017]
+
+The mongo backend is only measured when --mongo-url (or MONGO_URL) is set.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from middleware.rate_limiter import RateLimiter
+from middleware.rate_limit_backends import create_backend
+
+
+async def measure(limiter: RateLimiter, iterations: int, identities: int) -> dict:
+    # Warm up: create the shared segment / collection and first documents
+    for i in range(min(identities, 100)):
+        await limiter.check_rate_limit(f"10.0.{i // 256}.{i % 256}")
+
+    timings = []
+    for i in range(iterations):
+        identifier = f"10.0.{(i % identities) // 256}.{i % 256}"
+        started = time.perf_counter()
+        await limiter.check_rate_limit(identifier)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'mean_us': round(statistics.mean(timings), 2),
+        'p50_us': round(timings[len(timings) // 2], 2),
+        'p99_us': round(timings[int(len(timings) * 0.99) - 1], 2)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--identities', type=int, default=1000)
+    parser.add_argument('--mongo-url', default=os.getenv('MONGO_URL'))
+    args = parser.parse_args()
+
+    kinds = ['memory', 'shared_memory']
+    db = client = None
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url, serverSelectionTimeoutMS=5000)
+        db = client['rate_limit_benchmark']
+        kinds.append('mongo')
+
+    results = {}
+    try:
+        for kind in kinds:
+            # High limit so every check takes the allow path
+            limiter = RateLimiter(max_requests=10**9, window_seconds=60, name=f'benchmark_{kind}')
+            limiter.use_backend(create_backend(kind, limiter.name, db=db))
+            iterations = args.iterations if kind != 'mongo' else max(args.iterations // 10, 1)
+            results[kind] = await measure(limiter, iterations, args.identities)
+    finally:
+        if client is not None:
+            await client.drop_database('rate_limit_benchmark')
+            client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compare certificate render times for PDFService and ImageService
+
+Usage (from backend/):
+    python -m benchmarks.render_benchmark [--iterations 200]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from services.pdf_service import PDFService
+from services.image_service import ImageService
+
+
+def sample_signature(i: int):
+    return SimpleNamespace(
+        name=f"Benchmark Signer {i}",
+        phone="+91 98765 43210",
+        signature_number=12847 + i,
+        timestamp=datetime.utcnow()
+    )
+
+
+def measure(render, iterations: int) -> dict:
+    # First call pays for one-off template compilation and font loading
+    render(sample_signature(0))
+
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        render(sample_signature(i))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    results = {
+        'pdf_full_layout': measure(PDFService.generate_petition_pdf_full, args.iterations),
+        'pdf_template': measure(PDFService.generate_petition_pdf_from_template, args.iterations),
+        'image_template': measure(ImageService.generate_petition_image, max(args.iterations // 10, 1))
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
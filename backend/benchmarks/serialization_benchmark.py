@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Compare the stock FastAPI JSON path with the orjson / model_construct path
+
+For a page of signature documents (default 1,000 rows) measures:
+- admin_page: a dict of raw documents through jsonable_encoder + JSONResponse
+  (what FastAPI does for a plain return value) vs fast_json_response
+- signature_models: Signature(**doc) + response_model=List[Signature]
+  validation and serialization vs model_construct + model_dump + orjson
+
+Usage (from backend/):
+    python -m benchmarks.serialization_benchmark [--rows 1000] [--iterations 50]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models.signature import Signature
+
+
+def sample_documents(rows: int) -> List[dict]:
+    """Documents as the admin listing projects them"""
+    now = datetime.utcnow()
+    return [
+        {
+            'id': str(uuid.uuid4()),
+            'name': f"Benchmark Signer {i}",
+            'email': f"signer{i}@example.com" if i % 3 == 0 else None,
+            'phone': f"+91 98765 {i:05d}",
+            'signature_number': 12847 + i,
+            'timestamp': now - timedelta(seconds=i * 7)
+        }
+        for i in range(rows)
+    ]
+
+
+async def measure(encode, iterations: int) -> dict:
+    # First call pays for one-off schema and encoder setup
+    body = await encode()
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await encode()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'bytes': len(body),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p95_ms': round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3)
+    }
+
+
+async def run(rows: int, iterations: int) -> dict:
+    documents = sample_documents(rows)
+    page = {'signatures': documents, 'total': rows, 'page': 1, 'limit': rows, 'total_pages': 1}
+    signature_list_field = create_response_field(name='Response_signatures', type_=List[Signature])
+
+    async def admin_page_stock() -> bytes:
+        content = await serialize_response(response_content=page)
+        return JSONResponse(content).body
+
+    async def admin_page_fast() -> bytes:
+        return ORJSONResponse(page).body
+
+    async def signature_models_stock() -> bytes:
+        signatures = [Signature(**doc) for doc in documents]
+        content = await serialize_response(field=signature_list_field, response_content=signatures)
+        return JSONResponse(content).body
+
+    async def signature_models_fast() -> bytes:
+        signatures = [Signature.model_construct(**doc) for doc in documents]
+        return ORJSONResponse([signature.model_dump() for signature in signatures]).body
+
+    # Both paths must produce the same JSON
+    assert json.loads(await admin_page_stock()) == json.loads(await admin_page_fast())
+    assert json.loads(await signature_models_stock()) == json.loads(await signature_models_fast())
+
+    results = {}
+    for name, stock, fast in (
+        ('admin_page', admin_page_stock, admin_page_fast),
+        ('signature_models', signature_models_stock, signature_models_fast),
+    ):
+        stock_result = await measure(stock, iterations)
+        fast_result = await measure(fast, iterations)
+        results[name] = {
+            'stock': stock_result,
+            'fast': fast_result,
+            'speedup': round(stock_result['mean_ms'] / fast_result['mean_ms'], 1)
+        }
+    return {'rows': rows, **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.rows, args.iterations)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
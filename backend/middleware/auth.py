@@ -1,21 +1,93 @@
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import asyncio
+import jwt
+import logging
 import os
 import secrets
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
 
 class AdminAuthManager:
+    """Admin credentials and tokens
+
+    With ADMIN_JWT_SECRET set, tokens are signed JWTs that any worker can
+    verify without shared state; logout adds the token's jti to a small
+    denylist that is persisted in MongoDB and refreshed by every worker.
+    Without it, tokens are random strings kept in this process only.
+    """
+    
+    JWT_ALGORITHM = 'HS256'
+    
     def __init__(self):
         self.active_tokens: Dict[str, datetime] = {}
-        self.token_expiry_hours = 24
+        self.token_expiry_hours = int(os.getenv('ADMIN_TOKEN_EXPIRY_HOURS', '24'))
         
         # Get admin credentials from environment
         self.admin_username = os.getenv('ADMIN_USERNAME', 'admin')
         self.admin_password_hash = self._hash_password(os.getenv('ADMIN_PASSWORD', 'changeme123'))
+        
+        self.jwt_secret = os.getenv('ADMIN_JWT_SECRET')
+        self.token_mode = os.getenv('ADMIN_TOKEN_MODE', 'jwt' if self.jwt_secret else 'session')
+        if self.token_mode == 'jwt' and not self.jwt_secret:
+            # Still works, but only within this process and until restart
+            logger.warning("ADMIN_TOKEN_MODE=jwt without ADMIN_JWT_SECRET; using a per-process secret")
+            self.jwt_secret = secrets.token_urlsafe(32)
+        
+        # Revoked jti -> token expiry; entries are dropped once the token expires anyway
+        self.revoked: Dict[str, datetime] = {}
+        self.revocation_refresh_seconds = float(os.getenv('ADMIN_REVOCATION_REFRESH_SECONDS', '10'))
+        self._revoked_collection = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._last_refresh: Optional[datetime] = None
+    
+    def start(self, revoked_collection):
+        """Share logouts with other workers through revoked_collection (JWT mode)"""
+        if self.token_mode != 'jwt' or self._refresh_task is not None:
+            return
+        
+        self._revoked_collection = revoked_collection
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+    
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self._refresh_revocations()
+            except Exception as e:
+                logger.error(f"Failed to refresh revoked admin tokens: {str(e)}")
+            await asyncio.sleep(self.revocation_refresh_seconds)
+    
+    async def _refresh_revocations(self):
+        """Pull revocations made by other workers since the last refresh"""
+        query = {'expires_at': {'$gt': datetime.utcnow()}}
+        if self._last_refresh is not None:
+            # Small overlap so a revocation written during the last read isn't missed
+            query['revoked_at'] = {'$gte': self._last_refresh - timedelta(seconds=self.revocation_refresh_seconds)}
+        refreshed_at = datetime.utcnow()
+        
+        async for doc in self._revoked_collection.find(query, {'expires_at': 1}):
+            self.revoked[doc['_id']] = doc['expires_at']
+        self._last_refresh = refreshed_at
+        self._prune_revocations()
+    
+    def _prune_revocations(self):
+        now = datetime.utcnow()
+        for jti in [jti for jti, expires_at in self.revoked.items() if expires_at <= now]:
+            del self.revoked[jti]
     
     def _hash_password(self, password: str) -> str:
         """Hash password using SHA-256"""
@@ -31,13 +103,39 @@ class AdminAuthManager:
     
     def generate_token(self) -> str:
         """Generate a new authentication token"""
+        if self.token_mode == 'jwt':
+            now = datetime.now(timezone.utc)
+            claims = {
+                'sub': self.admin_username,
+                'iat': now,
+                'exp': now + timedelta(hours=self.token_expiry_hours),
+                'jti': secrets.token_urlsafe(16)
+            }
+            return jwt.encode(claims, self.jwt_secret, algorithm=self.JWT_ALGORITHM)
+        
+        self.cleanup_expired_tokens()
         token = secrets.token_urlsafe(32)
         expiry = datetime.now() + timedelta(hours=self.token_expiry_hours)
         self.active_tokens[token] = expiry
         return token
     
+    def _decode(self, token: str) -> Optional[dict]:
+        try:
+            return jwt.decode(
+                token,
+                self.jwt_secret,
+                algorithms=[self.JWT_ALGORITHM],
+                options={'require': ['exp', 'jti', 'sub']}
+            )
+        except jwt.PyJWTError:
+            return None
+    
     def verify_token(self, token: str) -> bool:
         """Verify if token is valid and not expired"""
+        if self.token_mode == 'jwt':
+            claims = self._decode(token)
+            return claims is not None and claims['sub'] == self.admin_username and claims['jti'] not in self.revoked
+        
         if token not in self.active_tokens:
             return False
         
@@ -48,8 +146,25 @@ class AdminAuthManager:
         
         return True
     
-    def revoke_token(self, token: str):
+    async def revoke_token(self, token: str):
         """Revoke a token"""
+        if self.token_mode == 'jwt':
+            claims = self._decode(token)
+            if claims is None:
+                return
+            
+            # Naive UTC, like the TTL index's expires_at and utcnow() comparisons
+            expires_at = datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+            self.revoked[claims['jti']] = expires_at
+            self._prune_revocations()
+            if self._revoked_collection is not None:
+                await self._revoked_collection.update_one(
+                    {'_id': claims['jti']},
+                    {'$set': {'expires_at': expires_at, 'revoked_at': datetime.utcnow()}},
+                    upsert=True
+                )
+            return
+        
         if token in self.active_tokens:
             del self.active_tokens[token]
     
@@ -0,0 +1,41 @@
+from services.metrics import UNMATCHED_ROUTE, http_request_duration, http_requests, http_requests_in_flight
+import time
+
+
+class PrometheusMiddleware:
+    """Per-route latency, status and in-flight metrics for every HTTP request
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streaming responses are not
+    buffered and the overhead stays at a few label lookups per request. The
+    route template is only known after routing, from scope["route"].
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+
+            route = scope.get('route')
+            route = getattr(route, 'path', None) or UNMATCHED_ROUTE
+            method = scope['method']
+            http_request_duration.labels(method, route).observe(elapsed)
+            http_requests.labels(method, route, str(status)).inc()
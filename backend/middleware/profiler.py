@@ -0,0 +1,79 @@
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from middleware.auth import verify_admin_token
+from services.database import database
+from services.request_profiler import profiled_request, request_profiler
+import time
+
+# Send "X-Profile: 1" with an admin bearer token to profile that request
+PROFILE_HEADER = b'x-profile'
+PROFILE_ID_HEADER = b'x-profile-id'
+
+
+class ProfilerMiddleware:
+    """Profiles single requests on demand from an authenticated admin
+
+    Requests without the header only pay for the header scan. A profiled
+    response carries X-Profile-Id; the folded stacks are then available
+    from /api/admin/profiles/{id}. A header with a missing or invalid admin
+    token is ignored, so it reveals nothing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        wants_profile = False
+        authorization = None
+        for name, value in scope['headers']:
+            if name == PROFILE_HEADER:
+                wants_profile = value not in (b'', b'0')
+            elif name == b'authorization':
+                authorization = value
+
+        if wants_profile and authorization and await self._is_admin(authorization):
+            await self._profile(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _is_admin(authorization: bytes) -> bool:
+        scheme, _, token = authorization.decode('latin-1').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return False
+        try:
+            await verify_admin_token(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+        except HTTPException:
+            return False
+        return True
+
+    async def _profile(self, scope, receive, send):
+        sampler = request_profiler.sampler()
+        if sampler is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = request_profiler.new_id()
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                message['headers'] = [*message.get('headers', []), (PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        # Tasks started by the request (e.g. streaming bodies) inherit this
+        context_token = profiled_request.set(sampler)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiled_request.reset(context_token)
+            await request_profiler.finish(
+                database.db, sampler, profile_id, scope['method'], scope['path'], status, time.perf_counter() - started
+            )
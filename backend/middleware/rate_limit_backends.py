@@ -0,0 +1,229 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+from typing import Tuple
+import asyncio
+import fcntl
+import hashlib
+import os
+import struct
+import tempfile
+
+
+class RateLimitBackend(ABC):
+    """Storage for sliding window counters
+
+    incr() counts a hit in `window` and returns the counts of that window and
+    the one before it; decr() takes back a hit that was rejected.
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    async def incr(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        ...
+
+    @abstractmethod
+    async def decr(self, key: str, window: int):
+        ...
+
+    def get_metrics(self) -> dict:
+        return {'backend': self.name}
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process counters in a bounded LRU (each worker enforces its own limit)"""
+
+    name = 'memory'
+
+    def __init__(self, max_identities: int = 100000):
+        self.max_identities = max_identities
+        # key -> (window index, count in that window, count in the previous window)
+        self.entries: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()
+        self.evicted = 0
+
+    async def incr(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        current_window, current, previous = self.entries.get(key, (window, 0, 0))
+        if window == current_window + 1:
+            previous, current = current, 0
+        elif window != current_window:
+            previous, current = 0, 0
+
+        current += 1
+        self.entries[key] = (window, current, previous)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_identities:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+        return current, previous
+
+    async def decr(self, key: str, window: int):
+        entry = self.entries.get(key)
+        if entry and entry[0] == window and entry[1] > 0:
+            self.entries[key] = (window, entry[1] - 1, entry[2])
+
+    def get_metrics(self) -> dict:
+        return {
+            'backend': self.name,
+            'identities': len(self.entries),
+            'max_identities': self.max_identities,
+            'evicted': self.evicted
+        }
+
+
+class SharedMemoryBackend(RateLimitBackend):
+    """Counters in a shared memory hash table, for several workers on one host
+
+    Slots hold (key hash, window index, current count, previous count). A key
+    probes a few slots; a slot whose window is older than the previous one is
+    free. When every probed slot is in use the stalest one is recycled, so the
+    table never grows. Updates are serialized with an flock on a lock file.
+
+    The flock is taken on the event loop on purpose: the critical section is
+    at most PROBES slot reads and one write in memory, with no I/O or await
+    inside, so it is held for microseconds by whichever worker has it. A
+    thread hop per request would cost more than the wait it avoids.
+    """
+
+    name = 'shared_memory'
+
+    SLOT = struct.Struct('<QqII')
+    PROBES = 8
+
+    def __init__(self, segment_name: str = 'petition_rate_limits', slots: int = 65536):
+        self.segment_name = segment_name
+        self.slots = slots
+        self.recycled = 0
+        self._shm = self._attach(segment_name, slots * self.SLOT.size)
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f'{segment_name}.lock'), 'a+')
+
+    @staticmethod
+    def _attach(segment_name: str, size: int) -> shared_memory.SharedMemory:
+        # The segment outlives any one worker; don't let the resource tracker
+        # unlink it when the worker that created it exits
+        try:
+            return shared_memory.SharedMemory(name=segment_name, create=True, size=size, track=False)
+        except FileExistsError:
+            return shared_memory.SharedMemory(name=segment_name, track=False)
+        except TypeError:
+            # Python < 3.13 has no track argument
+            from multiprocessing import resource_tracker
+            try:
+                shm = shared_memory.SharedMemory(name=segment_name, create=True, size=size)
+            except FileExistsError:
+                shm = shared_memory.SharedMemory(name=segment_name)
+            resource_tracker.unregister(shm._name, 'shared_memory')
+            return shm
+
+    def _key_hash(self, key: str) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+
+    def _find_slot(self, key_hash: int, window: int) -> Tuple[int, bool]:
+        """Slot offset for key_hash and whether it already belongs to it"""
+        buf = self._shm.buf
+        start = key_hash % self.slots
+        victim, victim_window = None, None
+        for probe in range(self.PROBES):
+            offset = ((start + probe) % self.slots) * self.SLOT.size
+            slot_hash, slot_window, _, _ = self.SLOT.unpack_from(buf, offset)
+            if slot_hash == key_hash:
+                return offset, True
+            if slot_hash == 0 or slot_window < window - 1:
+                return offset, False
+            if victim is None or slot_window < victim_window:
+                victim, victim_window = offset, slot_window
+        self.recycled += 1
+        return victim, False
+
+    async def incr(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        key_hash = self._key_hash(key)
+        buf = self._shm.buf
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            offset, owned = self._find_slot(key_hash, window)
+            current_window, current, previous = window, 0, 0
+            if owned:
+                _, current_window, current, previous = self.SLOT.unpack_from(buf, offset)
+                if window == current_window + 1:
+                    previous, current = current, 0
+                elif window != current_window:
+                    previous, current = 0, 0
+
+            current += 1
+            self.SLOT.pack_into(buf, offset, key_hash, window, current, previous)
+            return current, previous
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    async def decr(self, key: str, window: int):
+        key_hash = self._key_hash(key)
+        buf = self._shm.buf
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            offset, owned = self._find_slot(key_hash, window)
+            if owned:
+                _, slot_window, current, previous = self.SLOT.unpack_from(buf, offset)
+                if slot_window == window and current > 0:
+                    self.SLOT.pack_into(buf, offset, key_hash, window, current - 1, previous)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def get_metrics(self) -> dict:
+        return {
+            'backend': self.name,
+            'segment': self.segment_name,
+            'slots': self.slots,
+            'recycled': self.recycled
+        }
+
+
+class MongoBackend(RateLimitBackend):
+    """One counter document per key and window, shared by every host
+
+    Documents carry an expires_at TTL so MongoDB drops them two windows
+    after they were last needed.
+    """
+
+    name = 'mongo'
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def incr(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        expires_at = datetime.utcnow() + timedelta(seconds=2 * window_seconds)
+        # Both round trips go out together
+        doc, previous = await asyncio.gather(
+            self.collection.find_one_and_update(
+                {'_id': f'{key}|{window}'},
+                {'$inc': {'count': 1}, '$setOnInsert': {'expires_at': expires_at}},
+                upsert=True,
+                return_document=True
+            ),
+            self.collection.find_one({'_id': f'{key}|{window - 1}'}, {'count': 1})
+        )
+        return doc['count'], previous['count'] if previous else 0
+
+    async def decr(self, key: str, window: int):
+        await self.collection.update_one({'_id': f'{key}|{window}', 'count': {'$gt': 0}}, {'$inc': {'count': -1}})
+
+
+BACKENDS = ('memory', 'shared_memory', 'mongo')
+
+
+def create_backend(kind: str, limiter_name: str, db=None, max_identities: int = 100000) -> RateLimitBackend:
+    """Build the backend named by RATE_LIMIT_BACKEND for one limiter"""
+    if kind == 'memory':
+        return MemoryBackend(max_identities=max_identities)
+    if kind == 'shared_memory':
+        # One table per limiter, since window indexes differ between limiters
+        return SharedMemoryBackend(
+            segment_name=f"{os.getenv('RATE_LIMIT_SHM_NAME', 'petition_rate_limits')}_{limiter_name}",
+            slots=int(os.getenv('RATE_LIMIT_SHM_SLOTS', '65536'))
+        )
+    if kind == 'mongo':
+        if db is None:
+            raise ValueError("The mongo rate limit backend needs a database")
+        return MongoBackend(db.rate_limits)
+    raise ValueError(f"Unknown rate limit backend {kind!r}, expected one of: {', '.join(BACKENDS)}")
@@ -1,50 +1,149 @@
 from fastapi import Request, HTTPException
-from datetime import datetime, timedelta
-from collections import defaultdict
-import asyncio
+from ipaddress import IPv4Network, IPv6Network
+from typing import List, Optional, Tuple, Union
+from middleware.rate_limit_backends import RateLimitBackend, MemoryBackend, create_backend
+from services.metrics import rate_limit_rejections
+import ipaddress
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
 
 class RateLimiter:
-    def __init__(self, max_requests: int = 5, window_seconds: int = 60):
+    """Sliding window counter rate limiter
+
+    Each identity keeps the request count of the current and the previous
+    fixed window; the previous count is weighted by how much of it still
+    overlaps the sliding window. That is O(1) per check. Counts live in a
+    pluggable backend (RATE_LIMIT_BACKEND): per-process memory with a bounded
+    LRU, a shared memory table for several workers on one host, or MongoDB
+    for several hosts.
+    """
+
+    def __init__(self, max_requests: int = 5, window_seconds: int = 60, max_identities: Optional[int] = None, name: str = 'default'):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
-        self.cleanup_interval = 300  # Cleanup every 5 minutes
-        
+        self.max_identities = max_identities or int(os.getenv('RATE_LIMIT_MAX_IDENTITIES', '100000'))
+        self.name = name
+        self.backend: RateLimitBackend = MemoryBackend(max_identities=self.max_identities)
+
+        self.allowed = 0
+        self.rejected = 0
+        self.backend_errors = 0
+
+    def use_backend(self, backend: RateLimitBackend):
+        self.backend = backend
+
     async def check_rate_limit(self, identifier: str) -> bool:
         """Check if identifier has exceeded rate limit"""
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=self.window_seconds)
-        
-        # Remove old requests
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier]
-            if req_time > cutoff
-        ]
-        
-        # Check if limit exceeded
-        if len(self.requests[identifier]) >= self.max_requests:
-            return False
-        
-        # Add current request
-        self.requests[identifier].append(now)
-        return True
-    
-    async def cleanup_old_entries(self):
-        """Periodically cleanup old entries"""
-        while True:
-            await asyncio.sleep(self.cleanup_interval)
-            now = datetime.now()
-            cutoff = now - timedelta(seconds=self.window_seconds * 2)
-            
-            # Remove entries with no recent requests
-            to_delete = []
-            for identifier, times in self.requests.items():
-                if not times or max(times) < cutoff:
-                    to_delete.append(identifier)
-            
-            for identifier in to_delete:
-                del self.requests[identifier]
+        # Wall clock, so every worker and host agrees on window boundaries
+        now = time.time()
+        window = int(now // self.window_seconds)
+        key = f"{self.name}:{identifier}"
+
+        try:
+            current, previous = await self.backend.incr(key, window, self.window_seconds)
+        except Exception as e:
+            # Fail open: a storage outage must not take the petition down
+            self.backend_errors += 1
+            logger.error(f"Rate limit backend {self.backend.name} failed: {str(e)}")
+            return True
+
+        # Share of the previous window still inside the sliding window
+        overlap = 1 - (now % self.window_seconds) / self.window_seconds
+        allowed = previous * overlap + (current - 1) < self.max_requests
+        if allowed:
+            self.allowed += 1
+        else:
+            # Rejected attempts don't use up quota
+            self.rejected += 1
+            rate_limit_rejections.labels(self.name).inc()
+            try:
+                await self.backend.decr(key, window)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.error(f"Rate limit backend {self.backend.name} failed: {str(e)}")
+
+        return allowed
+
+    def get_metrics(self) -> dict:
+        return {
+            'max_requests': self.max_requests,
+            'window_seconds': self.window_seconds,
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'backend_errors': self.backend_errors,
+            **self.backend.get_metrics()
+        }
+
+
+def _parse_trusted_proxies(value: str) -> Tuple[bool, List[Union[IPv4Network, IPv6Network]]]:
+    """Comma-separated IPs/CIDRs, or '*' when the peer is always our edge proxy"""
+    networks = []
+    for entry in value.split(','):
+        entry = entry.strip()
+        if entry == '*':
+            return True, []
+        if entry:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+    return False, networks
+
+
+# Proxies whose X-Forwarded-For we believe (e.g. the Railway/Vercel edge).
+# Empty means the TCP peer is the client.
+TRUST_ALL_PROXIES, TRUSTED_PROXY_NETWORKS = _parse_trusted_proxies(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', ''))
+# With '*' the proxy addresses are unknown, so trust a fixed number of
+# X-Forwarded-For entries counted from the right (one per proxy in front of us)
+TRUSTED_HOPS = max(int(os.getenv('RATE_LIMIT_TRUSTED_HOPS', '1')), 1)
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXY_NETWORKS)
+
+
+def _normalize(address: str) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_address(address))
+    except ValueError:
+        return None
+
+
+def get_client_identifier(request: Request) -> str:
+    """Client IP for rate limiting, looking through trusted proxies
+
+    X-Forwarded-For is read from the right, where our proxies append. With
+    RATE_LIMIT_TRUSTED_PROXIES='*' the client is the TRUSTED_HOPS-th entry
+    from the right; with a CIDR list it is the right-most entry that is not a
+    trusted proxy. Entries further left are written by the client and are
+    never used, and garbage falls back to the TCP peer, so a caller cannot
+    pick a fresh bucket per request.
+    """
+    peer = request.client.host if request.client else 'unknown'
+    if not (TRUST_ALL_PROXIES or _is_trusted_proxy(peer)):
+        return peer
+
+    forwarded = request.headers.get('x-forwarded-for', '')
+    hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+
+    if TRUST_ALL_PROXIES:
+        client = hops[-TRUSTED_HOPS] if len(hops) >= TRUSTED_HOPS else None
+    else:
+        client = next((hop for hop in reversed(hops) if not _is_trusted_proxy(hop)), None)
+
+    # No usable entry (missing header, or every hop is one of our proxies)
+    return (client and _normalize(client)) or peer
 
 # Global rate limiter instances
-petition_rate_limiter = RateLimiter(max_requests=3, window_seconds=300)  # 3 submissions per 5 minutes
-api_rate_limiter = RateLimiter(max_requests=60, window_seconds=60)  # 60 requests per minute
+petition_rate_limiter = RateLimiter(max_requests=3, window_seconds=300, name='petition')  # 3 submissions per 5 minutes
+api_rate_limiter = RateLimiter(max_requests=60, window_seconds=60, name='api')  # 60 requests per minute
+
+def configure_rate_limiters(db=None):
+    """Move the global limiters to the backend named by RATE_LIMIT_BACKEND"""
+    kind = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    for limiter in (petition_rate_limiter, api_rate_limiter):
+        limiter.use_backend(create_backend(kind, limiter.name, db=db, max_identities=limiter.max_identities))
@@ -47,6 +47,27 @@ class SecurityValidator:
         
         return True, None
     
+    @staticmethod
+    def validate_signature(name: str, phone: str, email: Optional[str]) -> Optional[str]:
+        """First validation error for a signature's fields, or None"""
+        for is_valid, error in (
+            SecurityValidator.validate_name(name),
+            SecurityValidator.validate_phone(phone),
+            SecurityValidator.validate_email(email) if email else (True, None)
+        ):
+            if not is_valid:
+                return error
+        return None
+    
+    @staticmethod
+    def sanitize_signature(signature_data):
+        """Sanitize a SignatureCreate in place"""
+        signature_data.name = SecurityValidator.sanitize_string(signature_data.name, 100)
+        signature_data.phone = SecurityValidator.sanitize_string(signature_data.phone, 20)
+        if signature_data.email:
+            signature_data.email = SecurityValidator.sanitize_string(signature_data.email, 100)
+        return signature_data
+    
     @staticmethod
     def validate_email(email: str) -> tuple[bool, Optional[str]]:
         """Validate email format"""
@@ -1,22 +1,42 @@
-from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import List, Optional
 from datetime import datetime, timedelta
+import base64
 import csv
+import json
+import zlib
 from io import StringIO
 
 from models.admin import AdminLogin, SignatureFilter
 from models.signature import Signature
 from middleware.auth import auth_manager, verify_admin_token
-from motor.motor_asyncio import AsyncIOMotorClient
+from services.signature_service import SignatureService
+from services.signature_import import SignatureImporter, IMPORT_FORMATS
+from services.certificate_export import stream_certificates_zip, CERTIFICATE_FORMATS
+from middleware.rate_limiter import petition_rate_limiter, api_rate_limiter
+from services.stats_cache import petition_stats_cache, signature_count_cache
+from services.artifact_cache import artifact_cache
+from services.render_executor import render_executor
+from services.signature_batcher import signature_batcher
+from services.number_allocator import signature_number_allocator
+from services.rollup_service import RollupService
+from services.request_profiler import request_profiler
+from services.search_keys import SEARCH_KEY_FIELDS, build_search_filter
+from services.database import database, get_db
+from services.fast_json import fast_json_response
+from motor.motor_asyncio import AsyncIOMotorDatabase
 import os
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-# MongoDB connection
-MONGO_URL = os.getenv('MONGO_URL')
-DB_NAME = os.getenv('DB_NAME', 'test_database')
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+# Streaming CSV export: documents fetched per cursor round trip, rows per chunk
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '2000'))
+EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '500'))
+
+# Internal lookup fields are not part of the admin listing (phone_normalized
+# is only on signatures stored before it was retired)
+SIGNATURE_LIST_PROJECTION = {'_id': 0, 'phone_normalized': 0, **{field: 0 for field in SEARCH_KEY_FIELDS}}
 
 @router.post("/login")
 async def admin_login(credentials: AdminLogin):
@@ -27,15 +47,35 @@ async def admin_login(credentials: AdminLogin):
     token = auth_manager.generate_token()
     return {
         "token": token,
-        "expires_in": 86400  # 24 hours in seconds
+        "expires_in": auth_manager.token_expiry_hours * 3600
     }
 
 @router.post("/logout")
 async def admin_logout(token: str = Depends(verify_admin_token)):
     """Admin logout endpoint"""
-    auth_manager.revoke_token(token)
+    await auth_manager.revoke_token(token)
     return {"message": "Logged out successfully"}
 
+def _build_signature_query(search: Optional[str], date_from: Optional[str], date_to: Optional[str]) -> dict:
+    """Build the Mongo filter shared by the listing and export endpoints"""
+    query = {}
+    
+    # Search filter
+    if search:
+        search_filter = build_search_filter(search)
+        # Nothing searchable (e.g. only punctuation) matches nothing
+        query.update(search_filter if search_filter else {'_id': {'$exists': False}})
+    
+    # Date range filter
+    if date_from or date_to:
+        query['timestamp'] = {}
+        if date_from:
+            query['timestamp']['$gte'] = datetime.fromisoformat(date_from)
+        if date_to:
+            query['timestamp']['$lte'] = datetime.fromisoformat(date_to)
+    
+    return query
+
 @router.get("/signatures")
 async def get_all_signatures(
     page: int = 1,
@@ -43,113 +83,201 @@ async def get_all_signatures(
     search: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
-    token: str = Depends(verify_admin_token)
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    token: str = Depends(verify_admin_token),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Get all signatures with pagination and filtering"""
+    """Get all signatures with pagination and filtering
+    
+    pagination=cursor (or passing a cursor token) switches to keyset
+    pagination on (timestamp, id), which stays fast on deep pages.
+    """
+    try:
+        query = _build_signature_query(search, date_from, date_to)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching signatures: {str(e)}")
+    
+    # Raw documents from our own collection: no need for jsonable_encoder
+    if pagination == "cursor" or cursor:
+        return fast_json_response(await _get_signatures_by_cursor(db, query, limit, cursor, include_total))
+    
     try:
-        # Build query
-        query = {}
-        
-        # Search filter
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'phone': {'$regex': search, '$options': 'i'}}
-            ]
-        
-        # Date range filter
-        if date_from or date_to:
-            query['timestamp'] = {}
-            if date_from:
-                query['timestamp']['$gte'] = datetime.fromisoformat(date_from)
-            if date_to:
-                query['timestamp']['$lte'] = datetime.fromisoformat(date_to)
-        
         # Get total count
-        total = await db.signatures.count_documents(query)
+        total = await _count_signatures(db, query)
         
         # Get paginated results
         skip = (page - 1) * limit
         signatures = await db.signatures.find(
             query,
-            {'_id': 0}
-        ).sort('timestamp', -1).skip(skip).limit(limit).to_list(limit)
+            SIGNATURE_LIST_PROJECTION
+        ).sort([('timestamp', -1), ('id', -1)]).skip(skip).limit(limit).to_list(limit)
         
-        return {
+        return fast_json_response({
             'signatures': signatures,
             'total': total,
             'page': page,
             'limit': limit,
             'total_pages': (total + limit - 1) // limit
-        }
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching signatures: {str(e)}")
 
-@router.get("/stats")
-async def get_admin_stats(token: str = Depends(verify_admin_token)):
-    """Get detailed statistics for admin"""
-    try:
-        # Total signatures
-        total = await db.signatures.count_documents({})
+async def _get_signatures_by_cursor(db: AsyncIOMotorDatabase, filter_query: dict, limit: int, cursor: Optional[str], include_total: bool) -> dict:
+    """One keyset page, newest first, with opaque next/prev tokens"""
+    query = filter_query
+    direction = 'next'
+    if cursor:
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            direction = position['d']
+            anchor_time = datetime.fromisoformat(position['t'])
+            anchor_id = position['i']
+            if direction not in ('next', 'prev') or not isinstance(anchor_id, str):
+                raise ValueError(direction)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
         
-        # Signatures today
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_count = await db.signatures.count_documents({
-            'timestamp': {'$gte': today_start}
-        })
-        
-        # Signatures this week
-        week_start = today_start - timedelta(days=today_start.weekday())
-        week_count = await db.signatures.count_documents({
-            'timestamp': {'$gte': week_start}
-        })
+        op = '$lt' if direction == 'next' else '$gt'
+        keyset = {'$or': [
+            {'timestamp': {op: anchor_time}},
+            {'timestamp': anchor_time, 'id': {op: anchor_id}}
+        ]}
+        query = {'$and': [filter_query, keyset]} if filter_query else keyset
+    
+    try:
+        # Walk backwards in ascending order for prev pages, then flip
+        order = -1 if direction == 'next' else 1
+        signatures = await db.signatures.find(
+            query,
+            SIGNATURE_LIST_PROJECTION
+        ).sort([('timestamp', order), ('id', order)]).limit(limit + 1).to_list(limit + 1)
         
-        # Signatures this month
-        month_start = today_start.replace(day=1)
-        month_count = await db.signatures.count_documents({
-            'timestamp': {'$gte': month_start}
-        })
+        has_more = len(signatures) > limit
+        signatures = signatures[:limit]
+        if direction == 'prev':
+            signatures.reverse()
         
-        # Daily signatures for last 30 days
-        thirty_days_ago = today_start - timedelta(days=30)
-        pipeline = [
-            {'$match': {'timestamp': {'$gte': thirty_days_ago}}},
-            {
-                '$group': {
-                    '_id': {
-                        '$dateToString': {
-                            'format': '%Y-%m-%d',
-                            'date': '$timestamp'
-                        }
-                    },
-                    'count': {'$sum': 1}
-                }
-            },
-            {'$sort': {'_id': 1}}
-        ]
-        daily_stats = await db.signatures.aggregate(pipeline).to_list(None)
+        if direction == 'next':
+            next_cursor = _encode_cursor(signatures[-1], 'next') if has_more else None
+            prev_cursor = _encode_cursor(signatures[0], 'prev') if cursor and signatures else None
+        else:
+            next_cursor = _encode_cursor(signatures[-1], 'next') if signatures else None
+            prev_cursor = _encode_cursor(signatures[0], 'prev') if has_more else None
         
-        return {
-            'total_signatures': total,
-            'today': today_count,
-            'this_week': week_count,
-            'this_month': month_count,
-            'daily_trend': daily_stats
+        result = {
+            'signatures': signatures,
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
         }
+        if include_total:
+            result['total'] = await _count_signatures(db, filter_query)
+        return result
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching signatures: {str(e)}")
+
+def _encode_cursor(signature: dict, direction: str) -> str:
+    position = {'t': signature['timestamp'].isoformat(), 'i': signature['id'], 'd': direction}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+async def _count_signatures(db: AsyncIOMotorDatabase, query: dict) -> int:
+    """Estimated count when unfiltered, short-TTL cached exact count otherwise"""
+    if not query:
+        return await db.signatures.estimated_document_count()
+    
+    key = json.dumps(query, default=str, sort_keys=True)
+    total = signature_count_cache.get(key)
+    if total is None:
+        total = await db.signatures.count_documents(query)
+        signature_count_cache.set(key, total)
+    return total
+
+@router.get("/stats")
+async def get_admin_stats(token: str = Depends(verify_admin_token), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Get detailed statistics for admin"""
+    try:
+        # Served from the hourly/daily rollup buckets instead of counting
+        # raw signatures on every dashboard load
+        rollups = RollupService(db)
+        stats = await rollups.get_admin_stats()
+        stats['hourly_trend'] = await rollups.get_hourly_trend()
+        return fast_json_response(stats)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
 
+@router.get("/cache-stats")
+async def get_cache_stats(token: str = Depends(verify_admin_token)):
+    """Get counters for the caches, the render pool and the rate limiters"""
+    return {
+        'petition_stats': petition_stats_cache.get_metrics(),
+        'signature_counts': signature_count_cache.get_metrics(),
+        'artifacts': artifact_cache.get_metrics(),
+        'render_executor': render_executor.get_metrics(),
+        'rate_limiters': {
+            'petition': petition_rate_limiter.get_metrics(),
+            'api': api_rate_limiter.get_metrics()
+        }
+    }
+
+@router.get("/ingestion-stats")
+async def get_ingestion_stats(token: str = Depends(verify_admin_token)):
+    """Get write batching and signature number allocation metrics"""
+    allocator = signature_number_allocator.get_metrics()
+    if signature_number_allocator.enabled:
+        allocator['gaps'] = await signature_number_allocator.get_gap_report()
+    
+    return {
+        'batcher': signature_batcher.get_metrics(),
+        'number_allocator': allocator
+    }
+
+@router.get("/db-stats")
+async def get_db_stats(token: str = Depends(verify_admin_token)):
+    """Get MongoDB connection pool settings and per-server pool counters"""
+    return database.get_pool_stats()
+
+@router.get("/profiles")
+async def list_profiles(
+    limit: int = Query(20, ge=1, le=100),
+    token: str = Depends(verify_admin_token),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Recent request profiles taken with the X-Profile header"""
+    cursor = db.request_profiles.find({}, {'folded': 0}).sort('created_at', -1).limit(limit)
+    return {
+        'profiles': [{'id': doc.pop('_id'), **doc} async for doc in cursor],
+        'profiler': request_profiler.get_metrics()
+    }
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, token: str = Depends(verify_admin_token), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Folded stacks of one profile, for flamegraph.pl or speedscope"""
+    doc = await db.request_profiles.find_one({'_id': profile_id}, {'folded': 1})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return PlainTextResponse(
+        doc['folded'],
+        headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.folded"}
+    )
+
 @router.delete("/signature/{signature_id}")
-async def delete_signature(signature_id: str, token: str = Depends(verify_admin_token)):
+async def delete_signature(signature_id: str, token: str = Depends(verify_admin_token), db: AsyncIOMotorDatabase = Depends(get_db)):
     """Delete a signature (for spam/test entries)"""
     try:
-        result = await db.signatures.delete_one({'id': signature_id})
+        deleted = await SignatureService(db).delete_signature(signature_id)
         
-        if result.deleted_count == 0:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Signature not found")
         
+        # Admins expect the totals to drop right after a delete
+        signature_count_cache.clear()
+        
         return {"message": "Signature deleted successfully"}
     
     except HTTPException:
@@ -157,36 +285,127 @@ async def delete_signature(signature_id: str, token: str = Depends(verify_admin_
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting signature: {str(e)}")
 
-@router.get("/export-csv")
-async def export_signatures_csv(token: str = Depends(verify_admin_token)):
-    """Export all signatures to CSV"""
+@router.post("/import")
+async def import_signatures(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format"),
+    token: str = Depends(verify_admin_token),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Bulk import signatures from a streamed CSV or NDJSON request body
+    
+    CSV needs a header row with name and phone (email and timestamp are
+    optional); NDJSON takes one object per line with the same keys. Rows
+    are validated and written in batches, and the response lists the rows
+    that were rejected and the signature number ranges assigned (several
+    when live signups land between batches).
+    """
+    if fmt is None:
+        content_type = request.headers.get('content-type', '')
+        fmt = 'ndjson' if 'ndjson' in content_type or 'json' in content_type else 'csv'
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format, use one of: {', '.join(IMPORT_FORMATS)}")
+    
     try:
-        signatures = await db.signatures.find({}, {'_id': 0}).sort('timestamp', -1).to_list(None)
-        
-        # Create CSV
-        output = StringIO()
-        writer = csv.DictWriter(output, fieldnames=['signature_number', 'name', 'phone', 'email', 'timestamp'])
-        writer.writeheader()
-        
-        for sig in signatures:
-            writer.writerow({
-                'signature_number': sig.get('signature_number', ''),
-                'name': sig.get('name', ''),
-                'phone': sig.get('phone', ''),
-                'email': sig.get('email', ''),
-                'timestamp': sig.get('timestamp', '').isoformat() if sig.get('timestamp') else ''
-            })
-        
-        csv_content = output.getvalue()
-        output.close()
-        
-        return Response(
-            content=csv_content,
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=petition_signatures_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            }
-        )
+        report = await SignatureImporter(SignatureService(db)).run(request.stream(), fmt)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing signatures: {str(e)}")
     
+    if report['imported']:
+        signature_count_cache.clear()
+    return report
+
+@router.get("/export-csv")
+async def export_signatures_csv(
+    search: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    gzip: bool = False,
+    token: str = Depends(verify_admin_token),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Stream signatures as CSV, optionally gzip-compressed on the fly"""
+    try:
+        query = _build_signature_query(search, date_from, date_to)
+        cursor = db.signatures.find(
+            query,
+            {'_id': 0, 'signature_number': 1, 'name': 1, 'phone': 1, 'email': 1, 'timestamp': 1}
+        ).sort('timestamp', -1).batch_size(EXPORT_BATCH_SIZE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error exporting CSV: {str(e)}")
+    
+    headers = {
+        "Content-Disposition": f"attachment; filename=petition_signatures_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(
+        _stream_csv(cursor, gzip),
+        media_type="text/csv",
+        headers=headers
+    )
+
+@router.get("/export-certificates")
+async def export_certificates(
+    search: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    fmt: str = Query("pdf", alias="format"),
+    token: str = Depends(verify_admin_token),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Stream the PDF or PNG certificate of every matching signature as a ZIP"""
+    if fmt not in CERTIFICATE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported certificate format, use one of: {', '.join(CERTIFICATE_FORMATS)}")
+    
+    try:
+        query = _build_signature_query(search, date_from, date_to)
+        cursor = db.signatures.find(
+            query,
+            {'_id': 0, 'id': 1, 'name': 1, 'phone': 1, 'email': 1, 'signature_number': 1, 'timestamp': 1}
+        ).sort('timestamp', 1).batch_size(EXPORT_BATCH_SIZE)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting certificates: {str(e)}")
+    
+    filename = f"petition_certificates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        stream_certificates_zip(cursor, fmt),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+async def _stream_csv(cursor, compress: bool):
+    """Encode cursor rows into CSV chunks; memory stays at one chunk"""
+    output = StringIO()
+    writer = csv.DictWriter(output, fieldnames=['signature_number', 'name', 'phone', 'email', 'timestamp'])
+    writer.writeheader()
+    # wbits=31 produces a gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    
+    def take_chunk() -> bytes:
+        chunk = output.getvalue().encode('utf-8')
+        output.seek(0)
+        output.truncate(0)
+        return compressor.compress(chunk) if compressor else chunk
+    
+    rows = 0
+    async for sig in cursor:
+        writer.writerow({
+            'signature_number': sig.get('signature_number', ''),
+            'name': sig.get('name', ''),
+            'phone': sig.get('phone', ''),
+            'email': sig.get('email', ''),
+            'timestamp': sig.get('timestamp', '').isoformat() if sig.get('timestamp') else ''
+        })
+        rows += 1
+        if rows % EXPORT_CHUNK_ROWS == 0:
+            chunk = take_chunk()
+            if chunk:
+                yield chunk
+    
+    chunk = take_chunk()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
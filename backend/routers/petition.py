@@ -1,38 +1,66 @@
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from models.signature import SignatureCreate, Signature, PetitionStats
-from services.signature_service import SignatureService
+from services.signature_service import SignatureService, get_signature_service
 from services.pdf_service import PDFService
 from services.image_service import ImageService
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from middleware.rate_limiter import petition_rate_limiter, api_rate_limiter
+from services.stats_broadcaster import stats_broadcaster
+from services.artifact_cache import artifact_cache, CachedArtifact
+from services.render_executor import render_executor, RenderUnavailable
+from middleware.rate_limiter import petition_rate_limiter, api_rate_limiter, get_client_identifier
 from middleware.security import SecurityValidator
+from services.fast_json import fast_json_response
 import os
 
 router = APIRouter(prefix="/petition", tags=["petition"])
 
-# This will be initialized in server.py
-signature_service: SignatureService = None
+# Stats are shared by every visitor: let the CDN serve them for a few seconds
+# and keep serving the last copy while it refetches in the background
+STATS_EDGE_MAX_AGE_SECONDS = int(os.getenv('STATS_EDGE_MAX_AGE_SECONDS', '5'))
+STATS_STALE_WHILE_REVALIDATE_SECONDS = int(os.getenv('STATS_STALE_WHILE_REVALIDATE_SECONDS', '30'))
+STATS_CACHE_CONTROL = (
+    f"public, max-age=0, s-maxage={STATS_EDGE_MAX_AGE_SECONDS}, "
+    f"stale-while-revalidate={STATS_STALE_WHILE_REVALIDATE_SECONDS}"
+)
 
-def init_petition_router(db: AsyncIOMotorDatabase):
-    global signature_service
-    signature_service = SignatureService(db)
+# A certificate's bytes only change with its template version, which is part
+# of the ETag. They hold the signer's phone number, so by default only the
+# browser keeps them, not shared caches.
+CERTIFICATE_CACHE_CONTROL = os.getenv('CERTIFICATE_CACHE_CONTROL', 'private, max-age=31536000, immutable')
 
 @router.get("/stats", response_model=PetitionStats)
-async def get_petition_stats(request: Request):
+async def get_petition_stats(request: Request, signature_service: SignatureService = Depends(get_signature_service)):
     """Get petition statistics"""
     # Apply rate limiting
-    client_ip = request.client.host
+    client_ip = get_client_identifier(request)
     if not await api_rate_limiter.check_rate_limit(client_ip):
         raise HTTPException(status_code=429, detail="Too many requests. Please try again later.")
     
-    return await signature_service.get_petition_stats()
+    stats = await signature_service.get_petition_stats()
+    return fast_json_response(stats.model_dump(), headers={"Cache-Control": STATS_CACHE_CONTROL})
+
+@router.get("/stats/stream")
+async def stream_petition_stats(request: Request):
+    """Push petition statistics to the client as server-sent events"""
+    client_ip = get_client_identifier(request)
+    if not await api_rate_limiter.check_rate_limit(client_ip):
+        raise HTTPException(status_code=429, detail="Too many requests. Please try again later.")
+    
+    subscription = stats_broadcaster.subscribe()
+    return StreamingResponse(
+        stats_broadcaster.stream(subscription),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 @router.post("/sign", response_model=Signature)
-async def sign_petition(signature_data: SignatureCreate, request: Request):
+async def sign_petition(signature_data: SignatureCreate, request: Request, signature_service: SignatureService = Depends(get_signature_service)):
     """Submit a new petition signature with rate limiting and validation"""
     # Get client IP
-    client_ip = request.client.host
+    client_ip = get_client_identifier(request)
     
     # Apply strict rate limiting for petition submissions
     if not await petition_rate_limiter.check_rate_limit(client_ip):
@@ -42,75 +70,111 @@ async def sign_petition(signature_data: SignatureCreate, request: Request):
         )
     
     # Validate and sanitize inputs
-    is_valid, error = SecurityValidator.validate_name(signature_data.name)
-    if not is_valid:
-        raise HTTPException(status_code=400, detail=error)
-    
-    is_valid, error = SecurityValidator.validate_phone(signature_data.phone)
-    if not is_valid:
+    error = SecurityValidator.validate_signature(signature_data.name, signature_data.phone, signature_data.email)
+    if error:
         raise HTTPException(status_code=400, detail=error)
     
-    if signature_data.email:
-        is_valid, error = SecurityValidator.validate_email(signature_data.email)
-        if not is_valid:
-            raise HTTPException(status_code=400, detail=error)
-    
     # Sanitize inputs
-    signature_data.name = SecurityValidator.sanitize_string(signature_data.name, 100)
-    signature_data.phone = SecurityValidator.sanitize_string(signature_data.phone, 20)
-    if signature_data.email:
-        signature_data.email = SecurityValidator.sanitize_string(signature_data.email, 100)
+    SecurityValidator.sanitize_signature(signature_data)
     
     try:
         signature = await signature_service.create_signature(signature_data)
-        return signature
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create signature: {str(e)}")
+    
+    # Built from validated input; response_model stays for the API docs
+    return fast_json_response(signature.model_dump())
 
 @router.get("/signature/{signature_id}", response_model=Signature)
-async def get_signature(signature_id: str):
+async def get_signature(signature_id: str, signature_service: SignatureService = Depends(get_signature_service)):
     """Get a specific signature by ID"""
-    signature = await signature_service.get_signature(signature_id)
+    signature = await signature_service.get_signature(signature_id, validate=False)
     if not signature:
         raise HTTPException(status_code=404, detail="Signature not found")
-    return signature
+    return fast_json_response(signature.model_dump())
 
 @router.get("/download-pdf/{signature_id}")
-async def download_pdf(signature_id: str):
+async def download_pdf(signature_id: str, request: Request, signature_service: SignatureService = Depends(get_signature_service)):
     """Generate and download PDF of signed petition"""
     signature = await signature_service.get_signature(signature_id)
     if not signature:
         raise HTTPException(status_code=404, detail="Signature not found")
     
+    etag = _artifact_etag(signature_id, PDFService.TEMPLATE_VERSION, "pdf")
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    async def render() -> bytes:
+        return await render_executor.render_pdf(signature)
+    
     try:
-        pdf_buffer = PDFService.generate_petition_pdf(signature)
-        
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=petition_{signature_id}.pdf"
-            }
-        )
+        artifact = await artifact_cache.get_or_render(signature_id, PDFService.TEMPLATE_VERSION, "pdf", render)
+    except RenderUnavailable as e:
+        raise _render_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+    
+    return _artifact_response(artifact, "application/pdf", f"petition_{signature_id}.pdf", etag)
 
 @router.get("/download-image/{signature_id}")
-async def download_image(signature_id: str):
+async def download_image(signature_id: str, request: Request, signature_service: SignatureService = Depends(get_signature_service)):
     """Generate and download image of signed petition"""
     signature = await signature_service.get_signature(signature_id)
     if not signature:
         raise HTTPException(status_code=404, detail="Signature not found")
     
+    etag = _artifact_etag(signature_id, ImageService.TEMPLATE_VERSION, "png")
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    async def render() -> bytes:
+        return await render_executor.render_image(signature)
+    
     try:
-        image_buffer = ImageService.generate_petition_image(signature)
-        
-        return StreamingResponse(
-            image_buffer,
-            media_type="image/png",
-            headers={
-                "Content-Disposition": f"attachment; filename=petition_{signature_id}.png"
-            }
-        )
+        artifact = await artifact_cache.get_or_render(signature_id, ImageService.TEMPLATE_VERSION, "png", render)
+    except RenderUnavailable as e:
+        raise _render_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate image: {str(e)}")
+    
+    return _artifact_response(artifact, "image/png", f"petition_{signature_id}.png", etag)
+
+def _render_unavailable(error: RenderUnavailable) -> HTTPException:
+    """503 telling the client when to retry a busy or timed-out render"""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(render_executor.retry_after_seconds)}
+    )
+
+def _artifact_etag(signature_id: str, template_version: str, fmt: str) -> str:
+    """Strong validator: the content-addressed artifact key"""
+    return f'"{artifact_cache.make_key(signature_id, template_version, fmt)}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CERTIFICATE_CACHE_CONTROL})
+
+def _artifact_response(artifact: CachedArtifact, media_type: str, filename: str, etag: str) -> Response:
+    """Serve a cached artifact from memory, or straight from the disk tier"""
+    headers = {"ETag": etag, "Cache-Control": CERTIFICATE_CACHE_CONTROL}
+    if artifact.path is not None:
+        # FileResponse streams from disk (sendfile-style where the server supports it)
+        return FileResponse(artifact.path, media_type=media_type, filename=filename, headers=headers)
+    
+    return Response(
+        content=artifact.content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            **headers
+        }
+    )
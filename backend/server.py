@@ -1,11 +1,12 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends, Request, Response, HTTPException
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 import os
+import asyncio
+import hmac
 import logging
 from pathlib import Path
-import certifi
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List
 import uuid
@@ -15,17 +16,6 @@ from datetime import datetime, timezone
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-# Add TLS options for compatibility with Python 3.13 on Railway
-client = AsyncIOMotorClient(
-    mongo_url,
-    tls=True,
-    tlsCAFile=certifi.where(),
-    serverSelectionTimeoutMS=30000
-)
-db = client[os.environ['DB_NAME']]
-
 # Create the main app without a prefix
 app = FastAPI()
 
@@ -33,9 +23,21 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # Import and initialize petition router
-from routers.petition import router as petition_router, init_petition_router
+from routers.petition import router as petition_router
 from routers.admin import router as admin_router
 from services.signature_service import SignatureService
+from services.index_service import IndexService
+from services.database import database, get_db
+from services.stats_broadcaster import stats_broadcaster
+from services.signature_batcher import signature_batcher
+from services.number_allocator import signature_number_allocator
+from services.render_executor import render_executor
+from services.search_keys import ensure_search_keys
+from middleware.rate_limiter import configure_rate_limiters
+from middleware.auth import auth_manager
+from middleware.metrics import PrometheusMiddleware
+from middleware.profiler import ProfilerMiddleware
+from services.metrics import render_latest
 
 # Define Models
 class StatusCheck(BaseModel):
@@ -54,7 +56,7 @@ async def root():
     return {"message": "Hello World"}
 
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
+async def create_status_check(input: StatusCheckCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
     
@@ -66,7 +68,7 @@ async def create_status_check(input: StatusCheckCreate):
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
+async def get_status_checks(db: AsyncIOMotorDatabase = Depends(get_db)):
     # Exclude MongoDB's _id field from the query results
     status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
     
@@ -86,6 +88,21 @@ api_router.include_router(admin_router)
 # Include the router in the main app
 app.include_router(api_router)
 
+# The scraper sends "Authorization: Bearer <METRICS_TOKEN>"; without a token
+# configured, /metrics does not exist (it names routes, collections and limits)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = request.headers.get('authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    content, content_type = render_latest()
+    return Response(content=content, media_type=content_type)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -94,6 +111,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand admin profiling of single requests (X-Profile header)
+app.add_middleware(ProfilerMiddleware)
+
+# Outermost, so latency includes CORS handling and profiling
+app.add_middleware(PrometheusMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -104,14 +127,52 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    # Initialize petition router with database
-    init_petition_router(db)
+    # One client and connection pool for the whole worker, opened before
+    # the first request instead of on first use
+    db = database.connect()
+    await database.warm_up()
+    
+    # Make sure the registry indexes exist (no-op when already built)
+    await IndexService(db).ensure_indexes()
+    
+    # Shared rate limit state across workers/hosts (RATE_LIMIT_BACKEND)
+    configure_rate_limiters(db)
+    
+    # Share admin logouts between workers (JWT token mode only)
+    auth_manager.start(db.revoked_admin_tokens)
     
     # Initialize signature counter
     signature_service = SignatureService(db)
     await signature_service.initialize_counter()
+    await signature_service.start_number_allocator()
+    await signature_service.load_recent_signers()
+    
+    # Build the /admin/stats rollups from history on first deploy, in one
+    # process (build lease) and without holding up startup
+    app.state.rollup_build = asyncio.create_task(signature_service.rollups.ensure_built())
+    
+    # Same for the admin search keys of signatures stored before they existed
+    app.state.search_keys_backfill = asyncio.create_task(ensure_search_keys(db))
+    
+    # Batched write-behind ingestion (only runs when SIGN_BATCH_MODE is on)
+    signature_batcher.start(signature_service.create_signatures_batch)
+    
+    # Start pushing stats to /petition/stats/stream subscribers
+    stats_broadcaster.start(signature_service.get_petition_stats)
+    
+    # Spawn and warm up the PDF/PNG render workers
+    render_executor.start()
     logger.info("Petition service initialized successfully")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    # Write out queued signatures before the connection goes away
+    await signature_batcher.stop()
+    await signature_number_allocator.stop()
+    await stats_broadcaster.stop()
+    # An unfinished build leaves its lease to expire; the next start retries
+    app.state.rollup_build.cancel()
+    app.state.search_keys_backfill.cancel()
+    render_executor.stop()
+    await auth_manager.stop()
+    database.close()
\ No newline at end of file
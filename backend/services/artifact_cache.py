@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CachedArtifact:
+    """A rendered document, either held in memory or stored on local disk"""
+
+    def __init__(self, key: str, content: Optional[bytes] = None, path: Optional[Path] = None):
+        self.key = key
+        self.content = content
+        self.path = path
+
+
+class ArtifactCache:
+    """Two-tier (memory LRU + local disk) cache for generated PDFs and PNGs
+
+    Artifacts are content-addressed by (signature id, template version,
+    format). Disk files live under a per-signature directory so deleting a
+    signature can drop all of its artifacts at once.
+
+    The disk tier is capped at max_disk_bytes: once over, the least recently
+    used files (by mtime, refreshed on every disk hit) are deleted down to
+    DISK_PRUNE_TARGET of the budget. Several workers may share the
+    directory, so the running total is re-measured every
+    DISK_RESCAN_SECONDS rather than trusted forever.
+    """
+
+    DISK_PRUNE_TARGET = 0.9
+    DISK_RESCAN_SECONDS = 60
+
+    def __init__(self, cache_dir: str, max_memory_bytes: int = 64 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        # Disk bookkeeping runs in worker threads (asyncio.to_thread)
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self._disk_measured_at = 0.0
+        self.disk_pruned = 0
+
+        self._memory: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(signature_id: str, template_version: str, fmt: str) -> str:
+        return hashlib.sha256(f"{signature_id}:{template_version}:{fmt}".encode()).hexdigest()
+
+    def _signature_dir(self, signature_id: str) -> Path:
+        return self.cache_dir / hashlib.sha256(signature_id.encode()).hexdigest()
+
+    def _disk_path(self, signature_id: str, key: str, fmt: str) -> Path:
+        return self._signature_dir(signature_id) / f"{key}.{fmt}"
+
+    async def get_or_render(
+        self,
+        signature_id: str,
+        template_version: str,
+        fmt: str,
+        render: Callable[[], Awaitable[bytes]]
+    ) -> CachedArtifact:
+        """Return the cached artifact, rendering it at most once concurrently"""
+        key = self.make_key(signature_id, template_version, fmt)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return CachedArtifact(key, content=cached[1])
+
+        path = self._disk_path(signature_id, key, fmt)
+        if path.exists():
+            self.disk_hits += 1
+            self._touch(path)
+            return CachedArtifact(key, path=path)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Detached from the requesting task, so a client that disconnects
+            # does not cancel the render for everyone coalesced onto it
+            in_flight = asyncio.ensure_future(self._render_and_store(key, signature_id, path, render))
+            self._in_flight[key] = in_flight
+            in_flight.add_done_callback(lambda task: self._render_done(key, task))
+        return CachedArtifact(key, content=await asyncio.shield(in_flight))
+
+    async def _render_and_store(self, key: str, signature_id: str, path: Path, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        content = await render()
+        self._remember(key, signature_id, content)
+        await asyncio.to_thread(self._write_to_disk, path, content)
+        return content
+
+    def _render_done(self, key: str, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when nobody else was waiting
+            task.exception()
+
+    def lookup(self, signature_id: str, template_version: str, fmt: str) -> Optional[CachedArtifact]:
+        """Read-only check for an artifact, for bulk jobs
+
+        Does not refresh its LRU position, count a hit or store anything,
+        so one export cannot push live downloads out of the memory tier.
+        """
+        key = self.make_key(signature_id, template_version, fmt)
+        cached = self._memory.get(key)
+        if cached is not None:
+            return CachedArtifact(key, content=cached[1])
+
+        path = self._disk_path(signature_id, key, fmt)
+        if path.exists():
+            return CachedArtifact(key, path=path)
+        return None
+
+    async def evict_signature(self, signature_id: str):
+        """Drop every cached artifact for a deleted signature"""
+        for key in [key for key, (owner, _) in self._memory.items() if owner == signature_id]:
+            _, content = self._memory.pop(key)
+            self._memory_bytes -= len(content)
+        await asyncio.to_thread(self._remove_signature_dir, signature_id)
+
+    def _remove_signature_dir(self, signature_id: str):
+        directory = self._signature_dir(signature_id)
+        removed = sum(size for _, size, _ in self._scan(directory))
+        shutil.rmtree(directory, ignore_errors=True)
+        with self._disk_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes = max(self._disk_bytes - removed, 0)
+
+    @staticmethod
+    def _touch(path: Path):
+        """Mark a disk artifact as recently used for pruning"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remember(self, key: str, signature_id: str, content: bytes):
+        if len(content) > self.max_memory_bytes:
+            return
+        self._memory[key] = (signature_id, content)
+        self._memory_bytes += len(content)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _write_to_disk(self, path: Path, content: bytes):
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            logger.warning(f"Could not write artifact {path.name} to disk cache: {str(e)}")
+            return
+        self._account_disk_write(len(content))
+
+    @staticmethod
+    def _scan(directory: Path):
+        """(mtime, size, path) of every artifact file under directory"""
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _account_disk_write(self, size: int):
+        with self._disk_lock:
+            now = time.monotonic()
+            if self._disk_bytes is None or now - self._disk_measured_at > self.DISK_RESCAN_SECONDS:
+                self._disk_bytes = sum(size for _, size, _ in self._scan(self.cache_dir))
+                self._disk_measured_at = now
+            else:
+                self._disk_bytes += size
+
+            if self._disk_bytes > self.max_disk_bytes:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """Delete least recently used files until under DISK_PRUNE_TARGET of the budget"""
+        files = sorted(self._scan(self.cache_dir))
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * self.DISK_PRUNE_TARGET
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.disk_pruned += 1
+            try:
+                # Drop the signature directory once it is empty
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+        self._disk_bytes = total
+        self._disk_measured_at = time.monotonic()
+
+    def get_metrics(self) -> dict:
+        return {
+            'memory_items': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'max_memory_bytes': self.max_memory_bytes,
+            'disk_bytes': self._disk_bytes,
+            'max_disk_bytes': self.max_disk_bytes,
+            'disk_pruned': self.disk_pruned,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced
+        }
+
+
+# Global artifact cache shared by the download endpoints in this process
+artifact_cache = ArtifactCache(
+    cache_dir=os.getenv('ARTIFACT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'saaf_hawa_artifacts')),
+    max_memory_bytes=int(os.getenv('ARTIFACT_CACHE_MEMORY_MB', '64')) * 1024 * 1024,
+    max_disk_bytes=int(os.getenv('ARTIFACT_CACHE_DISK_MB', '512')) * 1024 * 1024
+)
@@ -0,0 +1,130 @@
+from typing import AsyncIterator, List, Optional
+from models.signature import Signature
+from services.artifact_cache import artifact_cache
+from services.render_executor import render_executor, RenderQueueFull
+from services.pdf_service import PDFService
+from services.image_service import ImageService
+import asyncio
+import os
+import zipfile
+
+# Renders in flight for all exports in this process together. By default one
+# fewer than the render workers, so at least one worker is always left for
+# live /download-* requests (with a single worker, exports and downloads share it)
+EXPORT_RENDER_CONCURRENCY = int(os.getenv('EXPORT_RENDER_CONCURRENCY', str(max(render_executor.workers - 1, 1))))
+# Attempts per certificate when the render queue is full
+EXPORT_RENDER_ATTEMPTS = 5
+
+_export_render_slots = asyncio.Semaphore(EXPORT_RENDER_CONCURRENCY)
+
+CERTIFICATE_FORMATS = {
+    'pdf': (PDFService.TEMPLATE_VERSION, render_executor.render_pdf),
+    'png': (ImageService.TEMPLATE_VERSION, render_executor.render_image),
+}
+
+
+class _ZipChunks:
+    """Write-only file object that hands back what zipfile wrote so far"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def _render_certificate(signature: Signature, fmt: str) -> bytes:
+    """Certificate bytes: an already cached copy, else a fresh render
+
+    Fresh renders are not added to the artifact cache; a bulk export would
+    otherwise fill its disk tier and evict certificates live downloads use.
+    """
+    template_version, render = CERTIFICATE_FORMATS[fmt]
+
+    artifact = artifact_cache.lookup(signature.id, template_version, fmt)
+    if artifact is not None:
+        if artifact.path is not None:
+            try:
+                return await asyncio.to_thread(artifact.path.read_bytes)
+            except FileNotFoundError:
+                # Pruned or evicted since the lookup
+                pass
+        else:
+            return artifact.content
+
+    for attempt in range(EXPORT_RENDER_ATTEMPTS):
+        try:
+            async with _export_render_slots:
+                return await render(signature)
+        except RenderQueueFull:
+            # Live downloads have the queue; wait for a slot instead of failing
+            if attempt == EXPORT_RENDER_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(render_executor.retry_after_seconds)
+
+
+async def stream_certificates_zip(cursor, fmt: str, concurrency: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Render the certificates of every signature in cursor into a streamed ZIP
+
+    Renders run concurrently (bounded per export by `concurrency`, and across
+    exports by EXPORT_RENDER_CONCURRENCY), and each certificate is added to
+    the archive as soon as it finishes, so at most `concurrency` documents are
+    in memory. Failures are listed in errors.txt at the end of the archive.
+    """
+    concurrency = concurrency or EXPORT_RENDER_CONCURRENCY
+    out = _ZipChunks()
+    archive = zipfile.ZipFile(out, mode='w', compression=zipfile.ZIP_STORED)
+    pending = {}
+    errors = []
+    documents = cursor.__aiter__()
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    doc = await documents.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                try:
+                    signature = Signature(**doc)
+                except Exception as e:
+                    errors.append(f"{doc.get('id')}: {str(e)}")
+                    continue
+                pending[asyncio.ensure_future(_render_certificate(signature, fmt))] = signature
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                signature = pending.pop(task)
+                name = f"{signature.signature_number}_{signature.id}.{fmt}"
+                try:
+                    content = task.result()
+                except Exception as e:
+                    errors.append(f"{name}: {str(e)}")
+                    continue
+
+                info = zipfile.ZipInfo(name, date_time=signature.timestamp.timetuple()[:6])
+                archive.writestr(info, content)
+            yield out.take()
+
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+        archive.close()
+        yield out.take()
+    finally:
+        # Client went away (or something failed): stop rendering for it
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,164 @@
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from typing import Dict, Optional
+from services.metrics import CommandMetricsListener
+import asyncio
+import certifi
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events per server (called from driver threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: Dict[str, dict] = {}
+
+    def _server(self, address) -> dict:
+        key = f"{address[0]}:{address[1]}"
+        if key not in self._servers:
+            self._servers[key] = {
+                'open': 0,
+                'in_use': 0,
+                'created': 0,
+                'closed': 0,
+                'checkouts': 0,
+                'checkout_failures': 0,
+                'pool_cleared': 0
+            }
+        return self._servers[key]
+
+    def _bump(self, address, **deltas):
+        with self._lock:
+            server = self._server(address)
+            for name, delta in deltas.items():
+                server[name] += delta
+
+    def pool_created(self, event):
+        self._bump(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(event.address, pool_cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump(event.address, created=1, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event.address, closed=1, open=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, checkouts=1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, in_use=-1)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {address: dict(stats) for address, stats in self._servers.items()}
+
+
+def client_options() -> dict:
+    """Driver options from the environment; unset values keep driver defaults"""
+    options = {
+        'serverSelectionTimeoutMS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000')),
+        'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+        'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+    }
+
+    # TLS options for compatibility with Python 3.13 on Railway
+    if os.getenv('MONGO_TLS', 'true').lower() in ('1', 'true', 'yes'):
+        options['tls'] = True
+        options['tlsCAFile'] = certifi.where()
+
+    optional = {
+        'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', int),
+        'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', int),
+        'compressors': ('MONGO_COMPRESSORS', str),  # e.g. "zstd,snappy,zlib"
+        'readConcernLevel': ('MONGO_READ_CONCERN', str),  # local, majority, ...
+        'readPreference': ('MONGO_READ_PREFERENCE', str),
+        'w': ('MONGO_WRITE_CONCERN', lambda value: int(value) if value.isdigit() else value),
+        'journal': ('MONGO_WRITE_JOURNAL', lambda value: value.lower() in ('1', 'true', 'yes')),
+    }
+    for option, (env_name, parse) in optional.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = parse(value)
+
+    return options
+
+
+class Database:
+    """The one Motor client (and connection pool) of this process"""
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self.pool_listener = PoolStatsListener()
+        self.command_listener = CommandMetricsListener()
+        self.options: dict = {}
+
+    def connect(self) -> AsyncIOMotorDatabase:
+        """Create the client on first use and return the configured database"""
+        if self.client is None:
+            self.options = client_options()
+            self.client = AsyncIOMotorClient(
+                os.environ['MONGO_URL'],
+                event_listeners=[self.pool_listener, self.command_listener],
+                **self.options
+            )
+            self.db = self.client[os.environ['DB_NAME']]
+        return self.db
+
+    async def warm_up(self):
+        """Open up to MONGO_WARMUP_CONNECTIONS (default minPoolSize) connections before serving"""
+        await self.db.command('ping')
+
+        connections = int(os.getenv('MONGO_WARMUP_CONNECTIONS', str(self.options.get('minPoolSize', 0))))
+        if connections > 1:
+            # Concurrent pings each need their own connection
+            await asyncio.gather(*(self.db.command('ping') for _ in range(connections)))
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.db = None
+
+    def get_pool_stats(self) -> dict:
+        return {
+            'max_pool_size': self.options.get('maxPoolSize'),
+            'min_pool_size': self.options.get('minPoolSize'),
+            'max_idle_time_ms': self.options.get('maxIdleTimeMS'),
+            'compressors': self.options.get('compressors'),
+            'servers': self.pool_listener.snapshot()
+        }
+
+
+# Global database shared by every router, service and CLI in this process
+database = Database()
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    """FastAPI dependency for the shared database"""
+    if database.db is None:
+        raise RuntimeError("Database is not connected; database.connect() runs at startup")
+    return database.db
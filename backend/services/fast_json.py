@@ -0,0 +1,20 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from typing import Any, Dict, Optional
+import os
+
+# Set FAST_JSON_RESPONSES=false to fall back to FastAPI's stock encoder
+FAST_JSON_RESPONSES = os.getenv('FAST_JSON_RESPONSES', 'true').lower() in ('1', 'true', 'yes')
+
+
+def fast_json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialize content with orjson, for routes that opt in
+
+    Returning a Response skips response_model validation and
+    jsonable_encoder's recursive walk, so content must already be plain
+    data: dicts, lists, strings, numbers and (naive UTC) datetimes, e.g.
+    documents from our own collections or model_dump() output.
+    """
+    if FAST_JSON_RESPONSES:
+        return ORJSONResponse(content, status_code=status_code, headers=headers)
+    return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
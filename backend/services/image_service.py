@@ -1,35 +1,57 @@
 from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
 from datetime import datetime
-import textwrap
+from functools import lru_cache
+from typing import Dict, Tuple
+import os
+
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+# zlib level for PNG output: 1 favours render time, 9 favours size
+PNG_COMPRESS_LEVEL = int(os.getenv('PNG_COMPRESS_LEVEL', '1'))
 
 class ImageService:
+    # Bump whenever the image layout changes so cached artifacts are not reused
+    TEMPLATE_VERSION = "1"
+    
+    WIDTH, HEIGHT = 1200, 1800
+    PADDING = 60
+    INFO_BOX_Y = 200
+    
     @staticmethod
-    def generate_petition_image(signature) -> BytesIO:
-        """Generate image for signed petition"""
-        # Create larger image for better quality
-        width, height = 1200, 1800
-        img = Image.new('RGB', (width, height), color='white')
-        draw = ImageDraw.Draw(img)
-        
+    @lru_cache(maxsize=1)
+    def load_fonts() -> Dict[str, ImageFont.ImageFont]:
+        """Load the fonts once per process"""
         # Try to use better fonts, fallback to default
         try:
-            title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 56)
-            subtitle_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 28)
-            heading_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 26)
-            body_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 20)
-            small_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-            tiny_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 14)
-        except:
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-            heading_font = ImageFont.load_default()
-            body_font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
-            tiny_font = ImageFont.load_default()
-        
-        y_position = 40
-        padding = 60
+            return {
+                'title': ImageFont.truetype(f"{FONT_DIR}/DejaVuSans-Bold.ttf", 56),
+                'heading': ImageFont.truetype(f"{FONT_DIR}/DejaVuSans-Bold.ttf", 26),
+                'body': ImageFont.truetype(f"{FONT_DIR}/DejaVuSans.ttf", 20),
+                'small': ImageFont.truetype(f"{FONT_DIR}/DejaVuSans.ttf", 16),
+                'tiny': ImageFont.truetype(f"{FONT_DIR}/DejaVuSans.ttf", 14),
+            }
+        except OSError:
+            default_font = ImageFont.load_default()
+            return {name: default_font for name in ('title', 'heading', 'body', 'small', 'tiny')}
+    
+    @staticmethod
+    @lru_cache(maxsize=2)
+    def _render_template(template_version: str) -> Tuple[Image.Image, int]:
+        """Render everything that is the same for every signer
+        
+        Returns the base image and the y position of the signer's name.
+        """
+        width, height = ImageService.WIDTH, ImageService.HEIGHT
+        padding = ImageService.PADDING
+        fonts = ImageService.load_fonts()
+        title_font = fonts['title']
+        heading_font = fonts['heading']
+        body_font = fonts['body']
+        small_font = fonts['small']
+        tiny_font = fonts['tiny']
+        
+        img = Image.new('RGB', (width, height), color='white')
+        draw = ImageDraw.Draw(img)
         
         # Header background
         draw.rectangle([(0, 0), (width, 160)], fill='black')
@@ -42,18 +64,11 @@ class ImageService:
         
         # No subtitle - removed Hindi text as per requirements
         
-        y_position = 200
+        y_position = ImageService.INFO_BOX_Y
         
-        # Info box background
+        # Info box background (signature number and date are drawn per signer)
         draw.rectangle([(padding, y_position), (width - padding, y_position + 60)], fill='#f5f5f5', outline='#cccccc', width=2)
         
-        # Signature number and date
-        draw.text((padding + 20, y_position + 18), f"Signature #{signature.signature_number}", fill='black', font=heading_font)
-        date_text = signature.timestamp.strftime('%B %d, %Y')
-        date_bbox = draw.textbbox((0, 0), f"Date: {date_text}", font=heading_font)
-        date_width = date_bbox[2] - date_bbox[0]
-        draw.text((width - padding - date_width - 20, y_position + 18), f"Date: {date_text}", fill='black', font=heading_font)
-        
         y_position += 100
         
         # TO section
@@ -113,12 +128,7 @@ class ImageService:
         
         draw.text((padding, y_position), "SIGNED BY:", fill='#888888', font=tiny_font)
         y_position += 40
-        
-        draw.text((padding, y_position), signature.name, fill='black', font=heading_font)
-        y_position += 40
-        
-        draw.text((padding, y_position), f"Phone: {signature.phone}", fill='#555555', font=body_font)
-        y_position += 50
+        signer_y = y_position
         
         # Footer
         footer_y = height - 110
@@ -135,8 +145,36 @@ class ImageService:
         footer_width2 = footer_bbox2[2] - footer_bbox2[0]
         draw.text(((width - footer_width2) / 2, footer_y + 30), footer_text2, fill='#999999', font=small_font)
         
-        # Save to buffer
+        return img, signer_y
+    
+    @staticmethod
+    def generate_petition_image(signature) -> BytesIO:
+        """Generate image for signed petition"""
+        # Start from the pre-rendered template and draw only the signer's fields
+        template, signer_y = ImageService._render_template(ImageService.TEMPLATE_VERSION)
+        img = template.copy()
+        draw = ImageDraw.Draw(img)
+        
+        width, padding = ImageService.WIDTH, ImageService.PADDING
+        fonts = ImageService.load_fonts()
+        heading_font = fonts['heading']
+        body_font = fonts['body']
+        
+        # Signature number and date
+        y_position = ImageService.INFO_BOX_Y
+        draw.text((padding + 20, y_position + 18), f"Signature #{signature.signature_number}", fill='black', font=heading_font)
+        date_text = signature.timestamp.strftime('%B %d, %Y')
+        date_bbox = draw.textbbox((0, 0), f"Date: {date_text}", font=heading_font)
+        date_width = date_bbox[2] - date_bbox[0]
+        draw.text((width - padding - date_width - 20, y_position + 18), f"Date: {date_text}", fill='black', font=heading_font)
+        
+        # Signer
+        draw.text((padding, signer_y), signature.name, fill='black', font=heading_font)
+        draw.text((padding, signer_y + 40), f"Phone: {signature.phone}", fill='#555555', font=body_font)
+        
+        # Save to buffer; zlib dominates the render, and level 1 is about a
+        # third faster than the default for ~30% larger files (same pixels)
         buffer = BytesIO()
-        img.save(buffer, format='PNG')
+        img.save(buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
         buffer.seek(0)
         return buffer
@@ -0,0 +1,139 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Declarative list of the indexes every collection should have. Names are
+# fixed so reconciliation is idempotent across workers and restarts.
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    'signatures': [
+        # Admin listing (offset and keyset pages), date-range counts and
+        # the recent signers seed
+        IndexModel([('timestamp', DESCENDING), ('id', DESCENDING)], name='timestamp_id_desc'),
+        # Admin delete looks signatures up by 'id' (not '_id')
+        IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+        IndexModel([('signature_number', ASCENDING)], name='signature_number_unique', unique=True),
+        # Admin search: anchored prefix matches on normalized keys
+        IndexModel([('name_tokens', ASCENDING)], name='name_tokens'),
+        IndexModel([('phone_suffixes', ASCENDING)], name='phone_suffixes'),
+    ],
+    'status_checks': [
+        IndexModel([('timestamp', DESCENDING)], name='timestamp_desc'),
+    ],
+    # Counters are only ever read and updated by _id
+    'counters': [],
+    # Rollup bucket ids sort chronologically, so ranges use the _id index
+    'signature_rollups': [],
+    # Shared rate limit counters (RATE_LIMIT_BACKEND=mongo) expire on their own
+    'rate_limits': [
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0),
+    ],
+    # Logged-out admin JWTs, kept only until the token would have expired
+    'revoked_admin_tokens': [
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0),
+        IndexModel([('revoked_at', ASCENDING)], name='revoked_at'),
+    ],
+    # On-demand request profiles (X-Profile), listed newest first
+    'request_profiles': [
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0),
+        IndexModel([('created_at', DESCENDING)], name='created_at_desc'),
+    ],
+}
+
+# Registry indexes that were removed; dropped at startup wherever they exist
+RETIRED_INDEXES: Dict[str, List[str]] = {
+    # Nothing queried phone_normalized; admin phone search uses phone_suffixes
+    'signatures': ['phone_normalized'],
+}
+
+
+class IndexService:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        """Create any registry index that does not exist yet and drop retired ones"""
+        await self.drop_retired_indexes()
+        created = {}
+        for collection_name, indexes in INDEX_REGISTRY.items():
+            created[collection_name] = []
+            for index in indexes:
+                name = index.document['name']
+                try:
+                    await self.db[collection_name].create_indexes([index])
+                    created[collection_name].append(name)
+                except OperationFailure as e:
+                    # Existing index with different options, or duplicates
+                    # blocking a unique index: report and keep starting up
+                    logger.error(f"Could not create index {collection_name}.{name}: {str(e)}")
+        return created
+
+    async def drop_retired_indexes(self):
+        for collection_name, names in RETIRED_INDEXES.items():
+            for name in names:
+                try:
+                    await self.db[collection_name].drop_index(name)
+                    logger.info(f"Dropped retired index {collection_name}.{name}")
+                except OperationFailure:
+                    # Already gone (another worker, or never created)
+                    pass
+
+    async def check_indexes(self) -> Dict[str, dict]:
+        """Report missing, unregistered and unused indexes per collection"""
+        report = {}
+        for collection_name, indexes in INDEX_REGISTRY.items():
+            collection = self.db[collection_name]
+            expected = {index.document['name'] for index in indexes}
+
+            existing = set()
+            async for index in collection.list_indexes():
+                existing.add(index['name'])
+
+            usage = {}
+            try:
+                async for stat in collection.aggregate([{'$indexStats': {}}]):
+                    usage[stat['name']] = stat['accesses']['ops']
+            except OperationFailure as e:
+                logger.warning(f"$indexStats unavailable for {collection_name}: {str(e)}")
+
+            report[collection_name] = {
+                'missing': sorted(expected - existing),
+                'unregistered': sorted(existing - expected - {'_id_'}),
+                'unused': sorted(name for name, ops in usage.items() if ops == 0 and name != '_id_'),
+                'usage': usage
+            }
+        return report
+
+
+if __name__ == "__main__":
+    # python -m services.index_service [--check]
+    import argparse
+    import asyncio
+    import json
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from services.database import database
+
+    parser = argparse.ArgumentParser(description="Reconcile or check MongoDB indexes")
+    parser.add_argument('--check', action='store_true', help="report missing/unused indexes without creating any")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+
+    async def main():
+        db = database.connect()
+        service = IndexService(db)
+        try:
+            if args.check:
+                result = await service.check_indexes()
+            else:
+                result = await service.ensure_indexes()
+            print(json.dumps(result, indent=2))
+        finally:
+            database.close()
+
+    asyncio.run(main())
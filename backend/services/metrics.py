@@ -0,0 +1,93 @@
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from pymongo import monitoring
+from typing import Dict, Tuple
+import os
+
+# Seconds; requests range from sub-millisecond stats reads to multi-second exports
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+RENDER_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+
+# Requests that matched no route share one label instead of one per URL
+UNMATCHED_ROUTE = 'unmatched'
+
+http_request_duration = Histogram(
+    'http_request_duration_seconds', "HTTP request latency by route template",
+    ['method', 'route'], buckets=REQUEST_BUCKETS
+)
+http_requests = Counter(
+    'http_requests_total', "HTTP responses by route template and status code",
+    ['method', 'route', 'status']
+)
+http_requests_in_flight = Gauge(
+    'http_requests_in_flight', "HTTP requests being served", multiprocess_mode='livesum'
+)
+
+mongodb_command_duration = Histogram(
+    'mongodb_command_duration_seconds', "MongoDB command round trips by collection and command",
+    ['collection', 'command'], buckets=COMMAND_BUCKETS
+)
+mongodb_command_failures = Counter(
+    'mongodb_command_failures_total', "MongoDB commands that returned an error",
+    ['collection', 'command']
+)
+
+render_duration = Histogram(
+    'render_duration_seconds', "Certificate render time in the worker, excluding queueing",
+    ['renderer'], buckets=RENDER_BUCKETS
+)
+render_jobs_in_flight = Gauge(
+    'render_jobs_in_flight', "Certificate renders queued or running", multiprocess_mode='livesum'
+)
+
+rate_limit_rejections = Counter(
+    'rate_limit_rejections_total', "Requests rejected by a rate limiter", ['limiter']
+)
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Times every driver command (called from driver threads)
+
+    Succeeded/failed events don't carry the command, so the collection name
+    is remembered from the started event by request id.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        if event.command_name == 'getMore':
+            collection = command.get('collection')
+        if not isinstance(collection, str):
+            # Server commands (ping, hello, ...) have no collection
+            collection = ''
+        self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def _finish(self, event, failed: bool):
+        labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is None:
+            return
+        mongodb_command_duration.labels(*labels).observe(event.duration_micros / 1_000_000)
+        if failed:
+            mongodb_command_failures.labels(*labels).inc()
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Prometheus text exposition of every metric in this process (or in all
+    workers when PROMETHEUS_MULTIPROC_DIR is set)"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
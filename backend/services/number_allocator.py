@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCKS_DOCUMENT_ID = "signature_number_blocks"
+
+
+class SignatureNumberAllocator:
+    """Hands out signature numbers from blocks reserved with a single $inc
+
+    Blocks come from a dedicated counters document so the displayed
+    signature_counter no longer sits on the numbering path. Its count is
+    bumped in the background with one $inc per flush interval.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        block_size: int = 100,
+        refill_threshold: float = 0.2,
+        count_flush_ms: int = 250
+    ):
+        self.enabled = enabled
+        self.block_size = block_size
+        # Start reserving the next block once this fraction of the current one is left
+        self.refill_threshold = refill_threshold
+        self.count_flush_ms = count_flush_ms
+
+        self._counters_collection = None
+        self._on_count_flushed: Optional[Callable[[], None]] = None
+        self._lock = asyncio.Lock()
+        self._next = 1
+        self._end = 0
+        self._prefetch: Optional[asyncio.Task] = None
+        self._pending_count = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.blocks_reserved = 0
+        self.numbers_issued = 0
+        self.numbers_abandoned = 0
+        self.reservation_seconds = 0.0
+
+    async def start(self, counters_collection, on_count_flushed: Optional[Callable[[], None]] = None):
+        """Make sure block reservation starts above every number already issued"""
+        self._counters_collection = counters_collection
+        self._on_count_flushed = on_count_flushed
+
+        counter = await counters_collection.find_one({"_id": "signature_counter"})
+        issued = counter["count"] if counter else 0
+
+        if self.enabled:
+            await counters_collection.update_one(
+                {"_id": BLOCKS_DOCUMENT_ID},
+                {"$max": {"reserved": issued}, "$setOnInsert": {"abandoned": 0}},
+                upsert=True
+            )
+            self._flush_task = asyncio.create_task(self._flush_counts())
+            return
+
+        # Block mode was used before: keep single-number allocation above it
+        blocks = await counters_collection.find_one({"_id": BLOCKS_DOCUMENT_ID})
+        if blocks and blocks.get("reserved", 0) > issued:
+            logger.warning(
+                f"Signature numbers up to {blocks['reserved']} were reserved in block mode; "
+                f"moving signature_counter up from {issued} to keep numbers unique"
+            )
+            await counters_collection.update_one(
+                {"_id": "signature_counter"},
+                {"$max": {"count": blocks["reserved"]}}
+            )
+
+    async def stop(self):
+        """Flush the pending count and report reserved numbers that were never used"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush_pending_count()
+
+        unused = self._end - self._next + 1
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is not None:
+            try:
+                start, end = await prefetch
+                unused += end - start + 1
+            except Exception:
+                pass
+        if unused > 0 and self._counters_collection is not None:
+            self.numbers_abandoned += unused
+            logger.info(f"Leaving {unused} reserved signature numbers unused (gap)")
+            await self._counters_collection.update_one(
+                {"_id": BLOCKS_DOCUMENT_ID},
+                {"$inc": {"abandoned": unused}}
+            )
+        self._next, self._end = 1, 0
+
+    async def allocate(self, count: int = 1) -> List[int]:
+        """Take count unique signature numbers from the local block"""
+        numbers: List[int] = []
+        async with self._lock:
+            while len(numbers) < count:
+                if self._next > self._end:
+                    await self._advance_block()
+
+                take = min(count - len(numbers), self._end - self._next + 1)
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+
+            remaining = self._end - self._next + 1
+            if remaining <= self.block_size * self.refill_threshold and self._prefetch is None:
+                self._prefetch = asyncio.create_task(self._reserve_block())
+
+        self.numbers_issued += count
+        return numbers
+
+    def record_signed(self, count: int):
+        """Queue a signature_counter increment for the next background flush"""
+        self._pending_count += count
+
+    async def _advance_block(self):
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is not None:
+            try:
+                self._next, self._end = await prefetch
+                return
+            except Exception as e:
+                logger.error(f"Background signature block reservation failed: {str(e)}")
+        self._next, self._end = await self._reserve_block()
+
+    async def _reserve_block(self) -> Tuple[int, int]:
+        started = time.perf_counter()
+        result = await self._counters_collection.find_one_and_update(
+            {"_id": BLOCKS_DOCUMENT_ID},
+            {"$inc": {"reserved": self.block_size}},
+            upsert=True,
+            return_document=True
+        )
+        self.reservation_seconds += time.perf_counter() - started
+        self.blocks_reserved += 1
+
+        end = result["reserved"]
+        return end - self.block_size + 1, end
+
+    async def _flush_counts(self):
+        while True:
+            await asyncio.sleep(self.count_flush_ms / 1000)
+            try:
+                await self._flush_pending_count()
+            except Exception as e:
+                logger.error(f"Failed to flush signature count: {str(e)}")
+
+    async def _flush_pending_count(self):
+        delta, self._pending_count = self._pending_count, 0
+        if not delta or self._counters_collection is None:
+            return
+
+        try:
+            await self._counters_collection.update_one(
+                {"_id": "signature_counter"},
+                {"$inc": {"count": delta}}
+            )
+        except Exception:
+            self._pending_count += delta
+            raise
+
+        if self._on_count_flushed:
+            self._on_count_flushed()
+
+    def get_metrics(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'block_size': self.block_size,
+            'blocks_reserved': self.blocks_reserved,
+            'numbers_issued': self.numbers_issued,
+            'numbers_remaining_in_block': max(self._end - self._next + 1, 0),
+            'numbers_abandoned': self.numbers_abandoned,
+            'pending_count_increment': self._pending_count,
+            'avg_reservation_ms': round(self.reservation_seconds / self.blocks_reserved * 1000, 3) if self.blocks_reserved else 0.0
+        }
+
+    async def get_gap_report(self) -> dict:
+        """Cluster-wide reserved vs. abandoned numbers from the blocks document"""
+        blocks = await self._counters_collection.find_one({"_id": BLOCKS_DOCUMENT_ID}) or {}
+        return {
+            'reserved': blocks.get('reserved', 0),
+            'abandoned': blocks.get('abandoned', 0)
+        }
+
+
+# Global allocator; opt in with SIGNATURE_BLOCK_ALLOCATION=true
+signature_number_allocator = SignatureNumberAllocator(
+    enabled=os.getenv('SIGNATURE_BLOCK_ALLOCATION', 'false').lower() in ('1', 'true', 'yes'),
+    block_size=int(os.getenv('SIGNATURE_BLOCK_SIZE', '100')),
+    count_flush_ms=int(os.getenv('SIGNATURE_COUNT_FLUSH_MS', '250'))
+)
@@ -1,28 +1,223 @@
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
+from reportlab.platypus import SimpleDocTemplate, BaseDocTemplate, PageTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable, Frame, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
+from reportlab.pdfgen.canvas import Canvas
 from io import BytesIO
 from datetime import datetime
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import NamedTuple, Optional
+import logging
 import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+PAGE_MARGIN = 0.75*inch
+
+INFO_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f5f5f5')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('PADDING', (0, 0), (-1, -1), 12),
+    ('BOX', (0, 0), (-1, -1), 1, colors.grey)
+])
+
+SIGNATURE_TABLE_STYLE = TableStyle([
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
+    ('TEXTCOLOR', (1, 0), (1, 0), colors.black),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (0, -1), 10),
+    ('FONTSIZE', (1, 0), (1, 0), 14),
+    ('FONTSIZE', (1, 1), (1, -1), 11),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 0)
+])
+
+class _Placement(NamedTuple):
+    page: int
+    flowable: Flowable
+    x: float
+    y: float
+    slack: float
+    avail_width: float
+    avail_height: float
+    width: float
+    height: float
+
+class _RecordedFlowable(Flowable):
+    """Stands in for a story flowable and records where platypus draws it
+    
+    Wrapping, splitting and spacing are answered by the wrapped flowable, so
+    the layout is the same as a full build; drawOn only records the position.
+    """
+    
+    def __init__(self, flowable, placements: list, doc):
+        super().__init__()
+        self.flowable = flowable
+        self._placements = placements
+        self._doc = doc
+        self._avail = (0, 0)
+    
+    def wrap(self, availWidth, availHeight):
+        self._avail = (availWidth, availHeight)
+        self.width, self.height = self.flowable.wrapOn(self.canv, availWidth, availHeight)
+        return self.width, self.height
+    
+    def split(self, availWidth, availHeight):
+        parts = self.flowable.splitOn(self.canv, availWidth, availHeight)
+        return [_RecordedFlowable(part, self._placements, self._doc) for part in parts]
+    
+    def getSpaceBefore(self):
+        return self.flowable.getSpaceBefore()
+    
+    def getSpaceAfter(self):
+        return self.flowable.getSpaceAfter()
+    
+    def getKeepWithNext(self):
+        return self.flowable.getKeepWithNext()
+    
+    def drawOn(self, canvas, x, y, _sW=0):
+        self._placements.append(_Placement(self._doc.page, self.flowable, x, y, _sW, *self._avail, self.width, self.height))
 
 class PDFService:
+    # Bump whenever the PDF layout changes so cached artifacts are not reused
+    # (and clients holding an immutable copy get a new ETag). Documents are
+    # rendered with invariant=1 (no creation date or random file id), so a
+    # signature and version always produce the same bytes.
+    TEMPLATE_VERSION = "2"
+    
+    # Stamp signer fields onto a precompiled page; set PDF_TEMPLATE_MODE=false
+    # to always use the full platypus renderer
+    TEMPLATE_MODE = os.getenv('PDF_TEMPLATE_MODE', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Compiled flowables are shared, so drawing them must not interleave
+    _template_lock = threading.Lock()
+    
     @staticmethod
     def generate_petition_pdf(signature) -> BytesIO:
         """Generate PDF for signed petition"""
+        if PDFService.TEMPLATE_MODE:
+            try:
+                buffer = PDFService.generate_petition_pdf_from_template(signature)
+                if buffer is not None:
+                    return buffer
+            except Exception as e:
+                logger.error(f"PDF template render failed, falling back to full layout: {str(e)}")
+        
+        return PDFService.generate_petition_pdf_full(signature)
+    
+    @staticmethod
+    def generate_petition_pdf_full(signature) -> BytesIO:
+        """Generate PDF for signed petition by laying out the whole story"""
         buffer = BytesIO()
         doc = SimpleDocTemplate(
             buffer, 
             pagesize=letter,
-            leftMargin=0.75*inch,
-            rightMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch
+            invariant=1,
+            leftMargin=PAGE_MARGIN,
+            rightMargin=PAGE_MARGIN,
+            topMargin=PAGE_MARGIN,
+            bottomMargin=PAGE_MARGIN
+        )
+        story = PDFService._build_story(signature, PDFService._build_styles())
+        
+        # Build PDF
+        doc.build(story)
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def generate_petition_pdf_from_template(signature) -> Optional[BytesIO]:
+        """Generate PDF for signed petition by stamping signer fields onto the precompiled page
+        
+        Returns None when the signer's tables would not occupy exactly the
+        placeholder's space (e.g. a name with line breaks), since everything
+        below them would move; render those with generate_petition_pdf_full.
+        """
+        placements = PDFService._compile_template(PDFService.TEMPLATE_VERSION)
+        if placements is None:
+            return None
+        
+        buffer = BytesIO()
+        canv = Canvas(buffer, pagesize=letter, invariant=1)
+        dynamic_tables = {
+            'info': PDFService._build_info_table(signature),
+            'signature': PDFService._build_signature_table(signature)
+        }
+        
+        # Same column widths and available space as the placeholder, so the
+        # real table must come out the same size to land where it was laid out
+        for placement in placements:
+            dynamic_name = getattr(placement.flowable, '_petition_field', None)
+            if dynamic_name:
+                size = dynamic_tables[dynamic_name].wrapOn(canv, placement.avail_width, placement.avail_height)
+                if size != (placement.width, placement.height):
+                    return None
+        
+        with PDFService._template_lock:
+            current_page = placements[0].page if placements else 1
+            for placement in placements:
+                if placement.page != current_page:
+                    canv.showPage()
+                    current_page = placement.page
+                
+                flowable = placement.flowable
+                dynamic_name = getattr(flowable, '_petition_field', None)
+                if dynamic_name:
+                    flowable = dynamic_tables[dynamic_name]
+                flowable.drawOn(canv, placement.x, placement.y, _sW=placement.slack)
+        
+        canv.showPage()
+        canv.save()
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    @lru_cache(maxsize=2)
+    def _compile_template(template_version: str) -> Optional[list]:
+        """Lay the document out once and remember where every flowable was placed
+        
+        None if a placeholder table had to be split across pages, which the
+        stamped tables cannot reproduce.
+        """
+        placeholder = SimpleNamespace(signature_number=0, timestamp=datetime(2000, 1, 1), name='', phone='')
+        story = PDFService._build_story(placeholder, PDFService._build_styles())
+        
+        # Same page geometry as generate_petition_pdf_full, but the flowables
+        # only record positions; splitting and page breaks still run through platypus
+        doc = BaseDocTemplate(
+            BytesIO(),
+            pagesize=letter,
+            leftMargin=PAGE_MARGIN,
+            rightMargin=PAGE_MARGIN,
+            topMargin=PAGE_MARGIN,
+            bottomMargin=PAGE_MARGIN
         )
+        placements = []
+        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+        doc.addPageTemplates([PageTemplate(id='Petition', frames=frame, pagesize=letter)])
+        doc.build([_RecordedFlowable(flowable, placements, doc) for flowable in story])
+        
+        dynamic_fields = [getattr(placement.flowable, '_petition_field', None) for placement in placements]
+        if sorted(filter(None, dynamic_fields)) != ['info', 'signature']:
+            logger.warning("PDF template placeholders were split or dropped; using the full layout")
+            return None
+        return placements
+    
+    @staticmethod
+    def _build_styles() -> dict:
         styles = getSampleStyleSheet()
-        story = []
         
         # Custom styles - Simple and professional
         title_style = ParagraphStyle(
@@ -63,29 +258,64 @@ class PDFService:
             textColor=colors.black
         )
         
-        # Simple header
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph("CLEAN AIR! MY RIGHT", title_style))
-        story.append(HRFlowable(width="100%", thickness=1, color=colors.grey, spaceAfter=20, spaceBefore=10))
+        to_style = ParagraphStyle('ToStyle', parent=body_style, fontSize=10, textColor=colors.grey)
         
+        footer_style = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.grey,
+            alignment=TA_CENTER,
+            leading=14
+        )
+        
+        return {
+            'title': title_style,
+            'header': header_style,
+            'body': body_style,
+            'emphasis': emphasis_style,
+            'to': to_style,
+            'footer': footer_style
+        }
+    
+    @staticmethod
+    def _build_info_table(signature) -> Table:
         # Signature info box
         info_data = [[f"Signature Number: #{signature.signature_number}", f"Date: {signature.timestamp.strftime('%B %d, %Y')}"]]
         info_table = Table(info_data, colWidths=[3.5*inch, 3*inch])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f5f5f5')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('PADDING', (0, 0), (-1, -1), 12),
-            ('BOX', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
-        story.append(info_table)
+        info_table.setStyle(INFO_TABLE_STYLE)
+        info_table._petition_field = 'info'
+        return info_table
+    
+    @staticmethod
+    def _build_signature_table(signature) -> Table:
+        # Signature details table
+        sig_data = [
+            ["SIGNED BY:", signature.name],
+            ["Phone:", signature.phone]
+        ]
+        sig_table = Table(sig_data, colWidths=[1.5*inch, 5*inch])
+        sig_table.setStyle(SIGNATURE_TABLE_STYLE)
+        sig_table._petition_field = 'signature'
+        return sig_table
+    
+    @staticmethod
+    def _build_story(signature, styles: dict) -> list:
+        story = []
+        body_style = styles['body']
+        emphasis_style = styles['emphasis']
+        
+        # Simple header
+        story.append(Spacer(1, 0.3*inch))
+        story.append(Paragraph("CLEAN AIR! MY RIGHT", styles['title']))
+        story.append(HRFlowable(width="100%", thickness=1, color=colors.grey, spaceAfter=20, spaceBefore=10))
+        
+        story.append(PDFService._build_info_table(signature))
         story.append(Spacer(1, 0.4*inch))
         
         # Petition letter
-        story.append(Paragraph("<b>TO:</b>", ParagraphStyle('ToStyle', parent=body_style, fontSize=10, textColor=colors.grey)))
-        story.append(Paragraph("Kind Attention Prime Minister, Chief Minister & the Leader of Opposition", header_style))
+        story.append(Paragraph("<b>TO:</b>", styles['to']))
+        story.append(Paragraph("Kind Attention Prime Minister, Chief Minister & the Leader of Opposition", styles['header']))
         story.append(Spacer(1, 0.3*inch))
         
         # Letter content
@@ -106,44 +336,12 @@ class PDFService:
         story.append(Paragraph("Sincerely,", body_style))
         story.append(Spacer(1, 0.2*inch))
         
-        # Signature details table
-        sig_data = [
-            ["SIGNED BY:", signature.name],
-            ["Phone:", signature.phone]
-        ]
-        sig_table = Table(sig_data, colWidths=[1.5*inch, 5*inch])
-        sig_table.setStyle(TableStyle([
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (1, 0), (1, 0), colors.black),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (0, -1), 10),
-            ('FONTSIZE', (1, 0), (1, 0), 14),
-            ('FONTSIZE', (1, 1), (1, -1), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0)
-        ]))
-        story.append(sig_table)
+        story.append(PDFService._build_signature_table(signature))
         
         # Footer
         story.append(Spacer(1, 0.6*inch))
         story.append(HRFlowable(width="100%", thickness=1, color=colors.grey, spaceAfter=15))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.grey,
-            alignment=TA_CENTER,
-            leading=14
-        )
-        story.append(Paragraph("A citizen-led movement demanding honest AQI data and real action on Delhi's air pollution crisis.", footer_style))
-        story.append(Paragraph("© 2025 Saaf Hawa | Citizen-led initiative", footer_style))
+        story.append(Paragraph("A citizen-led movement demanding honest AQI data and real action on Delhi's air pollution crisis.", styles['footer']))
+        story.append(Paragraph("© 2025 Saaf Hawa | Citizen-led initiative", styles['footer']))
         
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return story
@@ -0,0 +1,66 @@
+from collections import deque
+from datetime import datetime
+from typing import List
+import os
+import time
+
+
+class RecentSigners:
+    """Bounded in-memory ring buffer of the latest signers, newest first
+
+    Per process: signatures and deletes handled by other workers only show
+    up here on the next seed, so readers re-seed once the buffer is older
+    than max_age_seconds (the database stays the source of truth).
+    """
+
+    def __init__(self, size: int = 5, max_age_seconds: float = 5.0):
+        self.size = size
+        self.max_age_seconds = max_age_seconds
+        self._entries = deque(maxlen=size)
+        self._seeded_at = None
+        self.seeded = False
+
+    async def seed(self, signatures_collection):
+        """Load the latest signers from the database"""
+        docs = await signatures_collection.find(
+            {},
+            {'_id': 0, 'id': 1, 'name': 1, 'timestamp': 1}
+        ).sort('timestamp', -1).limit(self.size).to_list(self.size)
+
+        self._entries = deque(
+            ((doc.get('id'), doc['name'], doc['timestamp']) for doc in docs),
+            maxlen=self.size
+        )
+        self._seeded_at = time.monotonic()
+        self.seeded = True
+
+    def is_stale(self) -> bool:
+        """True if the buffer must be re-read before it is shown"""
+        return not self.seeded or time.monotonic() - self._seeded_at > self.max_age_seconds
+
+    def add(self, signature_id: str, name: str, timestamp: datetime):
+        """Record a new signer, pushing out the oldest one"""
+        self._entries.appendleft((signature_id, name, timestamp))
+
+    def evict(self, signature_id: str) -> bool:
+        """Remove a deleted signer; the buffer is re-seeded on next read"""
+        for entry in self._entries:
+            if entry[0] == signature_id:
+                self._entries.remove(entry)
+                self.seeded = False
+                return True
+        return False
+
+    def snapshot(self) -> List[dict]:
+        """Copy of the buffer as name/timestamp dicts"""
+        return [
+            {'name': name, 'timestamp': timestamp}
+            for _, name, timestamp in self._entries
+        ]
+
+
+# Global recent signers buffer shared by every SignatureService in this process
+recent_signers = RecentSigners(
+    size=int(os.getenv('RECENT_SIGNERS_SIZE', '5')),
+    max_age_seconds=float(os.getenv('RECENT_SIGNERS_MAX_AGE_SECONDS', '5'))
+)
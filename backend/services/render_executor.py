@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from services.pdf_service import PDFService
+from services.image_service import ImageService
+from services.metrics import render_duration, render_jobs_in_flight
+
+logger = logging.getLogger(__name__)
+
+
+class RenderUnavailable(Exception):
+    """The renderer cannot take this request right now; retry later"""
+
+
+class RenderQueueFull(RenderUnavailable):
+    pass
+
+
+class RenderTimeout(RenderUnavailable):
+    pass
+
+
+def render_pdf(signature) -> bytes:
+    return PDFService.generate_petition_pdf(signature).getvalue()
+
+
+def render_image(signature) -> bytes:
+    return ImageService.generate_petition_image(signature).getvalue()
+
+
+def _timed_render(fn: Callable, signature):
+    """(document bytes, seconds spent rendering) measured in the worker"""
+    started = time.perf_counter()
+    content = fn(signature)
+    return content, time.perf_counter() - started
+
+
+def _warm_up_worker():
+    """Render a throwaway document so fonts and layout code are loaded before real traffic"""
+    sample = SimpleNamespace(
+        name="Warm Up",
+        phone="0000000000",
+        signature_number=0,
+        timestamp=datetime.utcnow()
+    )
+    try:
+        render_pdf(sample)
+        render_image(sample)
+    except Exception as e:
+        logger.warning(f"Render worker warm-up failed: {str(e)}")
+
+
+def _ping() -> bool:
+    return True
+
+
+class RenderExecutor:
+    """Runs PDF/PNG rendering in a process pool so the event loop never blocks
+
+    At most workers + max_queue renders are outstanding; beyond that
+    callers get RenderQueueFull instead of piling up.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 16, timeout_seconds: float = 20.0, retry_after_seconds: int = 5):
+        # workers=0 renders in a thread instead (local development)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._outstanding = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def start(self):
+        """Start the pool and spawn every worker up front"""
+        if self.workers <= 0 or self._pool is not None:
+            return
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_warm_up_worker
+        )
+        for _ in range(self.workers):
+            self._pool.submit(_ping)
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def render_pdf(self, signature) -> bytes:
+        return await self._submit(render_pdf, signature, 'pdf')
+
+    async def render_image(self, signature) -> bytes:
+        return await self._submit(render_image, signature, 'image')
+
+    async def _submit(self, fn: Callable, signature, renderer: str) -> bytes:
+        if self._outstanding >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFull("Too many documents are being generated. Please try again shortly.")
+
+        self._outstanding += 1
+        try:
+            if self._pool is None:
+                future = asyncio.ensure_future(asyncio.to_thread(_timed_render, fn, signature))
+            else:
+                future = asyncio.wrap_future(self._pool.submit(_timed_render, fn, signature))
+        except BrokenProcessPool:
+            self._outstanding -= 1
+            self._restart()
+            raise RenderQueueFull("Document renderer is restarting. Please try again shortly.")
+
+        # The slot is held until the worker is actually free, even after a timeout
+        render_jobs_in_flight.inc()
+        future.add_done_callback(self._release)
+
+        try:
+            result, seconds = await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise RenderTimeout("Document generation timed out. Please try again shortly.")
+        except BrokenProcessPool:
+            self._restart()
+            raise RenderQueueFull("Document renderer is restarting. Please try again shortly.")
+
+        self.completed += 1
+        render_duration.labels(renderer).observe(seconds)
+        return result
+
+    def _release(self, future):
+        self._outstanding -= 1
+        render_jobs_in_flight.dec()
+        if not future.cancelled():
+            # Avoid "exception was never retrieved" for timed-out renders
+            future.exception()
+
+    def _restart(self):
+        logger.error("Render process pool broke; restarting it")
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def get_metrics(self) -> dict:
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'outstanding': self._outstanding,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out
+        }
+
+
+# Global render executor shared by the download endpoints in this process
+render_executor = RenderExecutor(
+    workers=int(os.getenv('RENDER_WORKERS', str(min(2, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv('RENDER_QUEUE_SIZE', '16')),
+    timeout_seconds=float(os.getenv('RENDER_TIMEOUT_SECONDS', '20'))
+)
@@ -0,0 +1,157 @@
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Pseudo stacks for samples where the profiled request was not on the loop
+IDLE_STACK = '(idle)'
+OTHER_STACK = '(other tasks)'
+IDLE_FRAME_PREFIX = 'selectors:'
+
+# The sampler of the profiled request, inherited by the tasks it starts
+profiled_request: ContextVar[Optional['StackSampler']] = ContextVar('profiled_request', default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+class StackSampler:
+    """Samples the event loop thread's Python stack on a timer thread
+
+    A sample counts for the request when the task running on the loop was
+    created in its context (the request task itself, or streaming bodies and
+    other tasks it started). Otherwise the sample is OTHER_STACK or, while
+    the loop waits for I/O, IDLE_STACK; the profile is the request's wall
+    clock time on the loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, thread_id: int, interval_seconds: float, max_seconds: float):
+        self.loop = loop
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        # A busy loop thread only hands over the GIL every switch interval
+        # (5ms by default), which would cap the sampling rate
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval_seconds))
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval_seconds) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            task = asyncio.current_task(self.loop)
+            self.stacks[self._fold(frame, task)] += 1
+            self.samples += 1
+
+    def _fold(self, frame, task) -> str:
+        if task is None or task.get_context().get(profiled_request) is not self:
+            # An empty stack is a C event loop (uvloop) waiting for I/O
+            if frame is None or _frame_label(frame).startswith(IDLE_FRAME_PREFIX):
+                return IDLE_STACK
+            return OTHER_STACK
+
+        labels = []
+        # The task's coroutines sit on top of the loop's own frames
+        while frame is not None and not frame.f_globals.get('__name__', '').startswith('asyncio.'):
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        return ';'.join(reversed(labels)) or OTHER_STACK
+
+    def folded(self) -> str:
+        """Brendan Gregg's collapsed stack format (flamegraph.pl, speedscope)"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """Runs single admin-requested requests under a StackSampler
+
+    One profile at a time per worker; the folded stacks are stored in MongoDB
+    for download from /api/admin/profiles.
+    """
+
+    def __init__(self, interval_ms: float = 2.0, max_seconds: float = 60.0, retention_hours: int = 72):
+        self.interval_seconds = interval_ms / 1000
+        self.max_seconds = max_seconds
+        self.retention_hours = retention_hours
+        self.active = False
+        self.profiled = 0
+        self.busy_skipped = 0
+
+    def sampler(self) -> Optional[StackSampler]:
+        """A started sampler for this event loop, or None if one is already running
+
+        Set profiled_request to it in the context of the request to profile.
+        """
+        if self.active:
+            self.busy_skipped += 1
+            return None
+        self.active = True
+        sampler = StackSampler(asyncio.get_running_loop(), threading.get_ident(), self.interval_seconds, self.max_seconds)
+        sampler.start()
+        return sampler
+
+    async def finish(self, db, sampler: StackSampler, profile_id: str, method: str, path: str, status: int, seconds: float):
+        sampler.stop()
+        self.active = False
+        self.profiled += 1
+
+        now = datetime.utcnow()
+        try:
+            await db.request_profiles.insert_one({
+                '_id': profile_id,
+                'method': method,
+                'path': path,
+                'status': status,
+                'duration_ms': round(seconds * 1000, 3),
+                'interval_ms': self.interval_seconds * 1000,
+                'samples': sampler.samples,
+                'folded': sampler.folded(),
+                'created_at': now,
+                'expires_at': now + timedelta(hours=self.retention_hours)
+            })
+        except Exception as e:
+            logger.error(f"Failed to store request profile {profile_id}: {str(e)}")
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def get_metrics(self) -> dict:
+        return {
+            'interval_ms': self.interval_seconds * 1000,
+            'max_seconds': self.max_seconds,
+            'active': self.active,
+            'profiled': self.profiled,
+            'busy_skipped': self.busy_skipped
+        }
+
+
+# Global profiler for this worker
+request_profiler = RequestProfiler(
+    interval_ms=float(os.getenv('PROFILER_INTERVAL_MS', '2')),
+    max_seconds=float(os.getenv('PROFILER_MAX_SECONDS', '60')),
+    retention_hours=int(os.getenv('PROFILER_RETENTION_HOURS', '72'))
+)
@@ -0,0 +1,246 @@
+from datetime import datetime, timedelta, timezone
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Buckets follow the campaign's local calendar, not UTC
+STATS_TIMEZONE = ZoneInfo(os.getenv('STATS_TIMEZONE', 'Asia/Kolkata'))
+
+TOTAL_ID = 'total'
+HOUR_PREFIX = 'hour:'
+DAY_PREFIX = 'day:'
+# Lease and status of the one-off build from history
+BUILD_ID = 'build'
+BUILD_LEASE_SECONDS = int(os.getenv('ROLLUP_BUILD_LEASE_SECONDS', '120'))
+# Signatures scanned between lease renewals
+BUILD_RENEW_EVERY = 10000
+
+
+def _local(timestamp: datetime) -> datetime:
+    """Signature timestamps are stored as naive UTC"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(STATS_TIMEZONE)
+
+
+def hour_key(timestamp: datetime) -> str:
+    return HOUR_PREFIX + _local(timestamp).strftime('%Y-%m-%dT%H')
+
+
+def day_key(timestamp: datetime) -> str:
+    return DAY_PREFIX + _local(timestamp).strftime('%Y-%m-%d')
+
+
+class RollupService:
+    """Per-hour and per-day signature counts, kept up to date with $inc
+
+    Bucket ids sort chronologically ('day:2025-01-31', 'hour:2025-01-31T09'),
+    so range reads go through the _id index.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.rollups_collection = db.signature_rollups
+        self.signatures_collection = db.signatures
+
+    async def record(self, timestamps: Iterable[datetime], delta: int = 1):
+        """Add delta to the buckets of each timestamp (negative for deletes)"""
+        increments: Dict[str, int] = {}
+        for timestamp in timestamps:
+            for key in (hour_key(timestamp), day_key(timestamp)):
+                increments[key] = increments.get(key, 0) + delta
+            increments[TOTAL_ID] = increments.get(TOTAL_ID, 0) + delta
+
+        if not increments:
+            return
+
+        try:
+            await self.rollups_collection.bulk_write([
+                UpdateOne({'_id': key}, {'$inc': {'count': count}}, upsert=True)
+                for key, count in increments.items()
+            ], ordered=False)
+        except Exception as e:
+            # The signature itself is stored; a rebuild repairs the rollups
+            logger.error(f"Failed to update signature rollups: {str(e)}")
+
+    async def ensure_built(self):
+        """Build the rollups from history once, in whichever process gets the lease
+
+        Run this off the startup path: it scans every signature. record()
+        keeps counting while it runs, so buckets are merged with $max instead
+        of replaced; signatures written during the scan can at worst be
+        missed in the bucket the scan read before they arrived. `rebuild()`
+        (CLI --rebuild) recomputes exactly when nothing is being written.
+        """
+        owner = uuid.uuid4().hex
+        if not await self._acquire_build_lease(owner):
+            return
+
+        try:
+            counts = await self._count_history(owner)
+            if counts is None:
+                logger.warning("Lost the signature rollup build lease; another process took over")
+                return
+            if len(counts) > 1 or counts[TOTAL_ID]:
+                await self.rollups_collection.bulk_write([
+                    UpdateOne({'_id': key}, {'$max': {'count': count}}, upsert=True)
+                    for key, count in counts.items()
+                ], ordered=False)
+            await self.rollups_collection.update_one(
+                {'_id': BUILD_ID, 'owner': owner},
+                {'$set': {'state': 'done', 'finished_at': datetime.utcnow()}}
+            )
+            logger.info(f"Built signature rollups: {counts[TOTAL_ID]} signatures, {len(counts) - 1} buckets")
+        except Exception as e:
+            # The lease expires, so the next start (in any process) retries
+            logger.error(f"Failed to build signature rollups: {str(e)}")
+
+    async def _acquire_build_lease(self, owner: str) -> bool:
+        """True if the build has not finished and no other process holds a live lease"""
+        now = datetime.utcnow()
+        try:
+            await self.rollups_collection.update_one(
+                {'_id': BUILD_ID, 'state': {'$ne': 'done'}, 'lease_until': {'$lt': now}},
+                {'$set': {'state': 'running', 'owner': owner, 'lease_until': now + timedelta(seconds=BUILD_LEASE_SECONDS)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Finished, or another process is building right now
+            return False
+        return True
+
+    async def _renew_build_lease(self, owner: str) -> bool:
+        result = await self.rollups_collection.update_one(
+            {'_id': BUILD_ID, 'owner': owner},
+            {'$set': {'lease_until': datetime.utcnow() + timedelta(seconds=BUILD_LEASE_SECONDS)}}
+        )
+        return result.matched_count == 1
+
+    async def _count_history(self, owner: Optional[str] = None) -> Optional[Dict[str, int]]:
+        """Bucket counts of every stored signature; None if the lease was lost"""
+        counts: Dict[str, int] = {TOTAL_ID: 0}
+        scanned = 0
+        cursor = self.signatures_collection.find({}, {'_id': 0, 'timestamp': 1})
+        async for doc in cursor:
+            scanned += 1
+            if owner and scanned % BUILD_RENEW_EVERY == 0 and not await self._renew_build_lease(owner):
+                return None
+            timestamp = doc.get('timestamp')
+            if timestamp is None:
+                continue
+            for key in (hour_key(timestamp), day_key(timestamp)):
+                counts[key] = counts.get(key, 0) + 1
+            counts[TOTAL_ID] += 1
+        return counts
+
+    async def rebuild(self) -> dict:
+        """Recompute every bucket from the signatures collection
+
+        Replaces the buckets, so $inc's from signatures written during the
+        scan are lost; run it while signing is quiet.
+        """
+        counts = await self._count_history()
+
+        existing = set()
+        async for doc in self.rollups_collection.find({'_id': {'$ne': BUILD_ID}}, {'_id': 1}):
+            existing.add(doc['_id'])
+
+        operations = [ReplaceOne({'_id': key}, {'count': count}, upsert=True) for key, count in counts.items()]
+        operations += [DeleteOne({'_id': key}) for key in existing - counts.keys()]
+        operations.append(UpdateOne(
+            {'_id': BUILD_ID},
+            {'$set': {'state': 'done', 'finished_at': datetime.utcnow()}, '$unset': {'owner': '', 'lease_until': ''}},
+            upsert=True
+        ))
+        await self.rollups_collection.bulk_write(operations, ordered=False)
+
+        return {
+            'total': counts[TOTAL_ID],
+            'buckets': len(counts) - 1,
+            'removed': len(existing - counts.keys())
+        }
+
+    async def get_admin_stats(self, now: Optional[datetime] = None) -> dict:
+        """Totals for today, this week and this month plus the 30 day trend"""
+        local_now = _local(now or datetime.utcnow())
+        today = local_now.date()
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+        trend_start = today - timedelta(days=30)
+        first_day = min(week_start, month_start, trend_start)
+
+        total_doc = await self.rollups_collection.find_one({'_id': TOTAL_ID})
+
+        days: Dict[str, int] = {}
+        cursor = self.rollups_collection.find({
+            '_id': {'$gte': DAY_PREFIX + first_day.isoformat(), '$lte': DAY_PREFIX + today.isoformat()}
+        })
+        async for doc in cursor:
+            days[doc['_id'][len(DAY_PREFIX):]] = doc['count']
+
+        def count_since(start) -> int:
+            return sum(count for day, count in days.items() if day >= start.isoformat())
+
+        return {
+            'total_signatures': total_doc['count'] if total_doc else 0,
+            'today': days.get(today.isoformat(), 0),
+            'this_week': count_since(week_start),
+            'this_month': count_since(month_start),
+            'daily_trend': [
+                {'_id': day, 'count': days[day]}
+                for day in sorted(days)
+                if day >= trend_start.isoformat() and days[day] > 0
+            ],
+            'timezone': str(STATS_TIMEZONE)
+        }
+
+    async def get_hourly_trend(self, hours: int = 24, now: Optional[datetime] = None) -> List[dict]:
+        """Signatures per local hour for the last `hours` hours"""
+        local_now = _local(now or datetime.utcnow())
+        start = local_now - timedelta(hours=hours - 1)
+        cursor = self.rollups_collection.find({
+            '_id': {'$gte': HOUR_PREFIX + start.strftime('%Y-%m-%dT%H'), '$lte': HOUR_PREFIX + local_now.strftime('%Y-%m-%dT%H')}
+        }).sort('_id', 1)
+        return [
+            {'_id': doc['_id'][len(HOUR_PREFIX):], 'count': doc['count']}
+            async for doc in cursor
+            if doc['count'] > 0
+        ]
+
+
+if __name__ == "__main__":
+    # python -m services.rollup_service [--rebuild]
+    import argparse
+    import asyncio
+    import json
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from services.database import database
+
+    parser = argparse.ArgumentParser(description="Show or rebuild the signature rollups")
+    parser.add_argument('--rebuild', action='store_true', help="recompute every bucket from the signatures collection")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+
+    async def main():
+        db = database.connect()
+        service = RollupService(db)
+        try:
+            if args.rebuild:
+                result = await service.rebuild()
+            else:
+                result = await service.get_admin_stats()
+            print(json.dumps(result, indent=2, default=str))
+        finally:
+            database.close()
+
+    asyncio.run(main())
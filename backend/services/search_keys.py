@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from typing import List, Optional
+import logging
+import os
+import re
+import unicodedata
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Bump when the normalization below changes so the backfill rewrites old keys
+SEARCH_KEYS_VERSION = 1
+
+# Shortest phone fragment that is searchable; keeps the suffix list small
+MIN_PHONE_FRAGMENT = 3
+
+# Fields written next to every signature; never returned by the admin API
+SEARCH_KEY_FIELDS = ('name_tokens', 'phone_suffixes', 'search_keys_version')
+
+# Lease and status of the startup backfill, one per SEARCH_KEYS_VERSION
+BACKFILL_ID = f'search_keys:v{SEARCH_KEYS_VERSION}'
+BACKFILL_LEASE_SECONDS = int(os.getenv('SEARCH_KEYS_BACKFILL_LEASE_SECONDS', '120'))
+
+
+def fold(text: str) -> str:
+    """Lower-case and strip accents so 'José' and 'jose' match"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def name_tokens(name: str) -> List[str]:
+    """Folded words of a name, in order, without duplicates"""
+    return list(dict.fromkeys(re.findall(r'\w+', fold(name))))
+
+
+def phone_suffixes(phone: str) -> List[str]:
+    """Every suffix of the digits-only phone, so a prefix match is a substring match"""
+    digits = re.sub(r'\D', '', phone or '')
+    return [digits[i:] for i in range(len(digits) - MIN_PHONE_FRAGMENT + 1)]
+
+
+def build_search_keys(name: str, phone: str) -> dict:
+    return {
+        'name_tokens': name_tokens(name),
+        'phone_suffixes': phone_suffixes(phone),
+        'search_keys_version': SEARCH_KEYS_VERSION
+    }
+
+
+def build_search_filter(search: str) -> Optional[dict]:
+    """Index-backed filter for the admin search box
+
+    Every word of the search must prefix-match a word of the name, or the
+    digits must appear anywhere in the phone number. All patterns are anchored
+    and escaped, so they become index range scans and user input is never
+    interpreted as a regex.
+    """
+    clauses = []
+
+    token_clauses = [{'name_tokens': re.compile('^' + re.escape(token))} for token in name_tokens(search)]
+    if token_clauses:
+        clauses.append(token_clauses[0] if len(token_clauses) == 1 else {'$and': token_clauses})
+
+    digits = re.sub(r'\D', '', search or '')
+    if len(digits) >= MIN_PHONE_FRAGMENT:
+        clauses.append({'phone_suffixes': re.compile('^' + re.escape(digits))})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+
+async def backfill_search_keys(db: AsyncIOMotorDatabase, batch_size: int = 500, on_batch=None) -> int:
+    """Write search keys on signatures stored before they existed (or with old keys)
+
+    on_batch, if given, is awaited after every batch and stops the backfill
+    by returning False.
+    """
+    cursor = db.signatures.find(
+        {'search_keys_version': {'$ne': SEARCH_KEYS_VERSION}},
+        {'_id': 1, 'name': 1, 'phone': 1}
+    )
+
+    updated = 0
+    operations = []
+    async for doc in cursor:
+        operations.append(UpdateOne(
+            {'_id': doc['_id']},
+            {'$set': build_search_keys(doc.get('name', ''), doc.get('phone', ''))}
+        ))
+        if len(operations) >= batch_size:
+            await db.signatures.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+            if on_batch and not await on_batch():
+                return updated
+
+    if operations:
+        await db.signatures.bulk_write(operations, ordered=False)
+        updated += len(operations)
+    return updated
+
+
+async def ensure_search_keys(db: AsyncIOMotorDatabase):
+    """Backfill search keys once per SEARCH_KEYS_VERSION, in whichever process gets the lease
+
+    Run this off the startup path: it scans every signature. New signatures
+    are stored with their keys, so nothing written during the backfill is
+    missed. Until it finishes, admin search cannot find older signatures.
+    """
+    owner = uuid.uuid4().hex
+    now = datetime.utcnow()
+    try:
+        await db.backfills.update_one(
+            {'_id': BACKFILL_ID, 'state': {'$ne': 'done'}, 'lease_until': {'$lt': now}},
+            {'$set': {'state': 'running', 'owner': owner, 'lease_until': now + timedelta(seconds=BACKFILL_LEASE_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Finished, or another process is backfilling right now
+        return
+
+    async def renew_lease() -> bool:
+        result = await db.backfills.update_one(
+            {'_id': BACKFILL_ID, 'owner': owner},
+            {'$set': {'lease_until': datetime.utcnow() + timedelta(seconds=BACKFILL_LEASE_SECONDS)}}
+        )
+        return result.matched_count == 1
+
+    try:
+        updated = await backfill_search_keys(db, on_batch=renew_lease)
+        result = await db.backfills.update_one(
+            {'_id': BACKFILL_ID, 'owner': owner},
+            {'$set': {'state': 'done', 'finished_at': datetime.utcnow(), 'updated': updated}}
+        )
+        if result.matched_count == 1:
+            logger.info(f"Backfilled search keys on {updated} signatures")
+        else:
+            logger.warning("Lost the search key backfill lease; another process took over")
+    except Exception as e:
+        # The lease expires, so the next start (in any process) retries
+        logger.error(f"Failed to backfill search keys: {str(e)}")
+
+
+if __name__ == "__main__":
+    # python -m services.search_keys
+    import asyncio
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from services.database import database
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+
+    async def main():
+        db = database.connect()
+        try:
+            updated = await backfill_search_keys(db)
+            print(f"Backfilled search keys on {updated} signatures")
+        finally:
+            database.close()
+
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from models.signature import Signature, SignatureCreate
+
+logger = logging.getLogger(__name__)
+
+
+class SignatureBatcher:
+    """Queues signatures in memory and writes them to the database in batches"""
+
+    def __init__(self, enabled: bool = False, max_batch_size: int = 100, max_delay_ms: int = 5):
+        self.enabled = enabled
+        # Larger batches / longer delays trade per-signer latency for throughput
+        self.max_batch_size = max_batch_size
+        self.max_delay_ms = max_delay_ms
+
+        self._pending: List[Tuple[SignatureCreate, asyncio.Future]] = []
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._flush_handler: Optional[Callable[[List[SignatureCreate]], Awaitable[list]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.batches_flushed = 0
+        self.signatures_flushed = 0
+        self.largest_batch = 0
+
+    def start(self, flush_handler: Callable[[List[SignatureCreate]], Awaitable[list]]):
+        """Start the flush loop
+
+        flush_handler receives a batch of SignatureCreate and returns, in the
+        same order, either the stored Signature or the Exception for each item.
+        """
+        self._flush_handler = flush_handler
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write out everything still queued"""
+        self._stopping = True
+        if self._task:
+            # Let the loop finish its current batch instead of cancelling a write
+            self._has_items.set()
+            self._full.set()
+            await self._task
+            self._task = None
+
+        while self._pending:
+            await self._flush()
+
+    async def submit(self, signature_data: SignatureCreate) -> Signature:
+        """Queue a signature and wait until its batch has been written"""
+        if self._task is None or self._stopping:
+            raise RuntimeError("Signature batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((signature_data, future))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._has_items.wait()
+            if self._stopping and not self._pending:
+                return
+
+            if len(self._pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_delay_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._has_items.clear()
+            self._full.clear()
+            await self._flush()
+
+            if self._pending or self._stopping:
+                self._has_items.set()
+
+    async def _flush(self):
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if not batch:
+            return
+
+        try:
+            results = await self._flush_handler([data for data, _ in batch])
+        except Exception as e:
+            logger.error(f"Failed to write signature batch of {len(batch)}: {str(e)}")
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        self.batches_flushed += 1
+        self.signatures_flushed += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+    def get_metrics(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'pending': len(self._pending),
+            'batches_flushed': self.batches_flushed,
+            'signatures_flushed': self.signatures_flushed,
+            'largest_batch': self.largest_batch,
+            'max_batch_size': self.max_batch_size,
+            'max_delay_ms': self.max_delay_ms
+        }
+
+
+# Global batcher; opt in with SIGN_BATCH_MODE=true
+signature_batcher = SignatureBatcher(
+    enabled=os.getenv('SIGN_BATCH_MODE', 'false').lower() in ('1', 'true', 'yes'),
+    max_batch_size=int(os.getenv('SIGN_BATCH_MAX_SIZE', '100')),
+    max_delay_ms=int(os.getenv('SIGN_BATCH_MAX_DELAY_MS', '5'))
+)
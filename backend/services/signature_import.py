@@ -0,0 +1,221 @@
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+from models.signature import Signature, SignatureCreate
+from middleware.security import SecurityValidator
+from services.signature_service import SignatureService
+import codecs
+import csv
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Rows validated and written per insert_many; also bounds memory per import
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '1000'))
+# Row errors kept for the report; later ones are only counted
+IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '1000'))
+# Longest line (or multi-line CSV record) accepted, in characters; a stream
+# without newlines would otherwise be buffered whole
+IMPORT_MAX_LINE_LENGTH = int(os.getenv('IMPORT_MAX_LINE_LENGTH', '65536'))
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+class LineTooLong(ValueError):
+    """A line or record is longer than IMPORT_MAX_LINE_LENGTH; the import stops there"""
+
+    def __init__(self, line_number: int, max_length: int):
+        super().__init__(f"Line {line_number} is longer than {max_length} characters")
+        self.line_number = line_number
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_length: int = IMPORT_MAX_LINE_LENGTH) -> AsyncIterator[str]:
+    """Decode a byte stream and yield its lines without their line endings"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    line_number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            line_number += 1
+            if len(line) > max_length:
+                raise LineTooLong(line_number, max_length)
+            yield line.rstrip('\r')
+        if len(pending) > max_length:
+            raise LineTooLong(line_number + 1, max_length)
+
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.rstrip('\r')
+
+
+async def iter_csv_records(lines: AsyncIterator[str], max_length: int = IMPORT_MAX_LINE_LENGTH) -> AsyncIterator[Tuple[int, dict]]:
+    """(line number, row dict) for a CSV with a header row
+
+    A quoted field may span lines; quotes are escaped by doubling, so a record
+    is complete once it holds an even number of quote characters.
+    """
+    header = None
+    record, record_line, line_number = '', 0, 0
+    async for line in lines:
+        line_number += 1
+        if not record:
+            record_line = line_number
+            record = line
+        else:
+            record += '\n' + line
+        if record.count('"') % 2:
+            # A stray quote would otherwise swallow the rest of the upload
+            if len(record) > max_length:
+                raise LineTooLong(record_line, max_length)
+            continue
+
+        values = next(csv.reader([record]), [])
+        record = ''
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            continue
+        yield record_line, dict(zip(header, values))
+
+    if record:
+        yield record_line, {'_error': "Unterminated quoted field"}
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, dict]]:
+    """(line number, object) for newline-delimited JSON"""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, {'_error': f"Invalid JSON: {str(e)}"}
+            continue
+        yield line_number, record if isinstance(record, dict) else {'_error': "Expected a JSON object"}
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """ISO 8601 timestamp as naive UTC, like the rest of the collection"""
+    if value in (None, ''):
+        return None
+    timestamp = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def validate_record(record: dict) -> Tuple[Optional[SignatureCreate], Optional[datetime], Optional[str]]:
+    """Validate and sanitize one imported row the same way /petition/sign does"""
+    if '_error' in record:
+        return None, None, record['_error']
+
+    name = str(record.get('name') or '').strip()
+    phone = str(record.get('phone') or '').strip()
+    email = str(record.get('email') or '').strip() or None
+
+    error = SecurityValidator.validate_signature(name, phone, email)
+    if error:
+        return None, None, error
+
+    try:
+        timestamp = _parse_timestamp(record.get('timestamp'))
+    except ValueError:
+        return None, None, "Invalid timestamp, expected ISO 8601"
+    if timestamp and timestamp > datetime.utcnow():
+        return None, None, "Timestamp is in the future"
+
+    try:
+        signature_data = SignatureCreate(name=name, phone=phone, email=email)
+    except ValidationError as e:
+        return None, None, e.errors()[0].get('msg', 'Invalid signature')
+
+    return SecurityValidator.sanitize_signature(signature_data), timestamp, None
+
+
+class SignatureImporter:
+    """Streams an upload into signatures, one validated batch at a time"""
+
+    def __init__(self, signature_service: SignatureService, batch_size: int = IMPORT_BATCH_SIZE):
+        self.signature_service = signature_service
+        self.batch_size = batch_size
+
+        self.received = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        # Contiguous runs of assigned numbers, as [first, last]; live signups
+        # and failed inserts between batches split them
+        self.number_ranges: List[List[int]] = []
+        self.stopped: Optional[str] = None
+
+    def _error(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({'row': row, 'error': message})
+
+    async def run(self, chunks: AsyncIterator[bytes], fmt: str) -> dict:
+        parse = iter_csv_records if fmt == 'csv' else iter_ndjson_records
+
+        batch: List[Tuple[int, SignatureCreate, Optional[datetime]]] = []
+        try:
+            async for row, record in parse(iter_lines(chunks)):
+                self.received += 1
+                signature_data, timestamp, error = validate_record(record)
+                if error:
+                    self._error(row, error)
+                    continue
+
+                batch.append((row, signature_data, timestamp))
+                if len(batch) >= self.batch_size:
+                    await self._write(batch)
+                    batch = []
+        except LineTooLong as e:
+            # Rows before it are still written; nothing after it is read
+            self._error(e.line_number, str(e))
+            self.stopped = str(e)
+
+        if batch:
+            await self._write(batch)
+
+        return self.report()
+
+    async def _write(self, batch: List[Tuple[int, SignatureCreate, Optional[datetime]]]):
+        """One signature number $inc and one unordered insert_many for the batch"""
+        try:
+            results = await self.signature_service.create_signatures_batch(
+                [signature_data for _, signature_data, _ in batch],
+                timestamps=[timestamp for _, _, timestamp in batch]
+            )
+        except Exception as e:
+            logger.error(f"Signature import batch failed: {str(e)}")
+            results = [e] * len(batch)
+
+        for (row, _, _), result in zip(batch, results):
+            if isinstance(result, Signature):
+                self.imported += 1
+                number = result.signature_number
+                if self.number_ranges and self.number_ranges[-1][1] == number - 1:
+                    self.number_ranges[-1][1] = number
+                else:
+                    self.number_ranges.append([number, number])
+            else:
+                self._error(row, str(result))
+
+    def report(self) -> dict:
+        return {
+            'received': self.received,
+            'imported': self.imported,
+            'failed': self.failed,
+            'signature_numbers': [{'first': first, 'last': last} for first, last in self.number_ranges],
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'stopped': self.stopped
+        }
@@ -1,13 +1,34 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+from typing import List, Optional
 from models.signature import Signature, SignatureCreate, PetitionStats
+from services.artifact_cache import artifact_cache
+from services.stats_cache import petition_stats_cache
+from services.stats_broadcaster import stats_broadcaster
+from services.recent_signers import recent_signers
+from services.signature_batcher import signature_batcher
+from services.number_allocator import signature_number_allocator
+from services.rollup_service import RollupService
+from services.search_keys import build_search_keys
+from services.database import get_db
 import os
 
+# Stored fields that make up a Signature (documents also hold search keys)
+SIGNATURE_PROJECTION = {field: 1 for field in Signature.model_fields if field != 'id'}
+# Fields a document must carry to skip validation; model_construct would
+# silently omit or invent (default_factory) them
+SIGNATURE_TRUSTED_FIELDS = frozenset(
+    name for name, field in Signature.model_fields.items() if field.is_required() or field.default_factory
+)
+
 class SignatureService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.signatures_collection = db.signatures
         self.counters_collection = db.counters
+        self.rollups = RollupService(db)
     
     async def initialize_counter(self):
         """Initialize signature counter if not exists"""
@@ -18,72 +39,176 @@ class SignatureService:
                 "count": 12847  # Starting from mock value
             })
     
+    async def start_number_allocator(self):
+        """Prepare block-reserved signature numbers (SIGNATURE_BLOCK_ALLOCATION)"""
+        await signature_number_allocator.start(self.counters_collection, self._signatures_changed)
+    
+    async def load_recent_signers(self):
+        """Seed the in-memory recent signers buffer"""
+        await recent_signers.seed(self.signatures_collection)
+    
     async def get_next_signature_number(self) -> int:
         """Get and increment signature counter"""
+        numbers = await self.reserve_signature_numbers(1)
+        return numbers[0]
+    
+    async def reserve_signature_numbers(self, count: int) -> List[int]:
+        """Reserve count unique signature numbers and bump the signature counter"""
+        if signature_number_allocator.enabled:
+            numbers = await signature_number_allocator.allocate(count)
+            signature_number_allocator.record_signed(count)
+            return numbers
+        
         result = await self.counters_collection.find_one_and_update(
             {"_id": "signature_counter"},
-            {"$inc": {"count": 1}},
+            {"$inc": {"count": count}},
             return_document=True
         )
-        return result["count"]
+        first_number = result["count"] - count + 1
+        return list(range(first_number, result["count"] + 1))
     
     async def create_signature(self, signature_data: SignatureCreate) -> Signature:
         """Create a new signature"""
+        if signature_batcher.enabled:
+            return await signature_batcher.submit(signature_data)
+        
         signature_number = await self.get_next_signature_number()
+        signature = self._build_signature(signature_data, signature_number, datetime.utcnow())
         
-        signature = Signature(
+        await self.signatures_collection.insert_one(self._to_document(signature))
+        await self._record_new_signatures([signature])
+        
+        return signature
+    
+    async def create_signatures_batch(self, batch: List[SignatureCreate], timestamps: Optional[List[datetime]] = None) -> list:
+        """Write a batch of signatures with one counter update and one insert
+        
+        timestamps (e.g. from an offline signature drive) default to now.
+        Returns the stored Signature or the Exception for each item, in order.
+        """
+        numbers = await self.reserve_signature_numbers(len(batch))
+        
+        now = datetime.utcnow()
+        signatures = [
+            self._build_signature(signature_data, number, timestamps[i] if timestamps and timestamps[i] else now)
+            for i, (signature_data, number) in enumerate(zip(batch, numbers))
+        ]
+        results = list(signatures)
+        
+        try:
+            await self.signatures_collection.insert_many(
+                [self._to_document(signature) for signature in signatures],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                results[error['index']] = Exception(error.get('errmsg', 'Failed to insert signature'))
+        
+        await self._record_new_signatures(
+            [r for r in results if isinstance(r, Signature)],
+            backdated=bool(timestamps) and any(timestamps)
+        )
+        return results
+    
+    def _build_signature(self, signature_data: SignatureCreate, signature_number: int, timestamp: datetime) -> Signature:
+        return Signature(
             name=signature_data.name,
             email=signature_data.email,
             phone=signature_data.phone,
             signature_number=signature_number,
-            timestamp=datetime.utcnow()
+            timestamp=timestamp
         )
-        
-        # Convert to dict and insert
+    
+    def _to_document(self, signature: Signature) -> dict:
+        """Convert a signature to the document stored in MongoDB"""
         signature_dict = signature.dict()
         signature_dict['_id'] = signature_dict['id']
+        signature_dict.update(build_search_keys(signature.name, signature.phone))
+        return signature_dict
+    
+    async def _record_new_signatures(self, signatures: List[Signature], backdated: bool = False):
+        """Update rollups and in-memory state after signatures were written"""
+        if not signatures:
+            return
         
-        await self.signatures_collection.insert_one(signature_dict)
-        
-        return signature
+        await self.rollups.record([signature.timestamp for signature in signatures])
+        if backdated:
+            # Imported signers may not be the newest; re-read them in order
+            recent_signers.seeded = False
+        else:
+            for signature in signatures:
+                recent_signers.add(signature.id, signature.name, signature.timestamp)
+        self._signatures_changed()
     
-    async def get_signature(self, signature_id: str) -> Signature:
-        """Get a signature by ID"""
-        signature_doc = await self.signatures_collection.find_one({"_id": signature_id})
+    async def get_signature(self, signature_id: str, validate: bool = True) -> Signature:
+        """Get a signature by ID
+        
+        validate=False is for callers that only serialize the result: our own
+        documents were validated on the way in, so complete ones skip
+        re-validation. Documents missing a field are still validated and fail
+        as before.
+        """
+        signature_doc = await self.signatures_collection.find_one({"_id": signature_id}, SIGNATURE_PROJECTION)
         if not signature_doc:
             return None
         
-        signature_doc['id'] = signature_doc['_id']
+        signature_doc['id'] = signature_doc.pop('_id')
+        if not validate and SIGNATURE_TRUSTED_FIELDS <= signature_doc.keys():
+            return Signature.model_construct(**signature_doc)
         return Signature(**signature_doc)
     
+    async def delete_signature(self, signature_id: str) -> bool:
+        """Delete a signature, returns False if it did not exist"""
+        deleted = await self.signatures_collection.find_one_and_delete(
+            {'id': signature_id},
+            projection={'timestamp': 1}
+        )
+        if deleted is None:
+            return False
+        
+        if deleted.get('timestamp'):
+            await self.rollups.record([deleted['timestamp']], delta=-1)
+        recent_signers.evict(signature_id)
+        await artifact_cache.evict_signature(signature_id)
+        self._signatures_changed()
+        return True
+    
+    def _signatures_changed(self):
+        """Invalidate cached stats and push the change to stream subscribers"""
+        petition_stats_cache.invalidate()
+        stats_broadcaster.notify()
+    
     async def get_petition_stats(self) -> PetitionStats:
-        """Get petition statistics"""
+        """Get petition statistics (served from the shared stats cache)"""
+        return await petition_stats_cache.get(self._load_petition_stats)
+    
+    async def _load_petition_stats(self) -> PetitionStats:
+        """Load petition statistics (recent signers come from memory)"""
         # Get total count
         counter = await self.counters_collection.find_one({"_id": "signature_counter"})
         total = counter["count"] if counter else 0
         
-        # Get recent 5 signatures
-        recent_docs = await self.signatures_collection.find().sort("timestamp", -1).limit(5).to_list(5)
+        # Recent signers are kept in a ring buffer, re-read every few seconds
+        # so signatures and deletes from other workers show up here too
+        if recent_signers.is_stale():
+            await recent_signers.seed(self.signatures_collection)
         
-        recent_signatures = []
-        for doc in recent_docs:
-            time_diff = datetime.utcnow() - doc['timestamp']
-            
-            if time_diff.total_seconds() < 60:
-                time_ago = f"{int(time_diff.total_seconds())} seconds ago"
-            elif time_diff.total_seconds() < 3600:
-                time_ago = f"{int(time_diff.total_seconds() / 60)} minutes ago"
-            elif time_diff.total_seconds() < 86400:
-                time_ago = f"{int(time_diff.total_seconds() / 3600)} hours ago"
-            else:
-                time_ago = f"{int(time_diff.total_seconds() / 86400)} days ago"
-            
-            recent_signatures.append({
-                "name": doc['name'],
-                "timestamp": time_ago
-            })
+        # Absolute times, so the response stays the same until the next
+        # signature and can be cached; clients show them as "N minutes ago"
+        recent_signatures = [
+            {
+                "name": entry['name'],
+                "timestamp": entry['timestamp'].replace(tzinfo=timezone.utc).isoformat(timespec='milliseconds')
+            }
+            for entry in recent_signers.snapshot()
+        ]
         
         return PetitionStats(
             total_signatures=total,
             recent_signatures=recent_signatures
         )
+
+
+def get_signature_service(db: AsyncIOMotorDatabase = Depends(get_db)) -> SignatureService:
+    """FastAPI dependency; override it (or get_db) in tests"""
+    return SignatureService(db)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class StatsSubscription:
+    """A single stream connection with its own bounded send queue"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def close(self):
+        """Drain pending frames and wake the reader so it can exit"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class StatsBroadcaster:
+    """Fans petition stats out to every stream subscriber in this process"""
+
+    def __init__(
+        self,
+        min_interval_ms: int = 1000,
+        heartbeat_seconds: float = 15.0,
+        queue_size: int = 8,
+        poll_seconds: float = 5.0
+    ):
+        self.min_interval_ms = min_interval_ms
+        self.heartbeat_seconds = heartbeat_seconds
+        self.queue_size = queue_size
+        # Signatures written by other workers never call notify() here, so
+        # refresh on a timer while anyone is listening.
+        self.poll_seconds = poll_seconds
+
+        self._subscribers: Set[StatsSubscription] = set()
+        self._changed = asyncio.Event()
+        self._loader: Optional[Callable[[], Awaitable[Any]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_frame: Optional[str] = None
+
+        self.frames_sent = 0
+        self.slow_consumers_dropped = 0
+
+    def start(self, loader: Callable[[], Awaitable[Any]]):
+        """Start the broadcast loop; loader returns the current PetitionStats"""
+        self._loader = loader
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the broadcast loop and close every subscriber"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for subscription in list(self._subscribers):
+            subscription.close()
+        self._subscribers.clear()
+
+    def notify(self):
+        """Signal that the stats changed; bursts are coalesced by the loop"""
+        self._changed.set()
+
+    def subscribe(self) -> StatsSubscription:
+        """Register a new connection and queue the latest frame for it"""
+        subscription = StatsSubscription(self.queue_size)
+        self._subscribers.add(subscription)
+
+        if self._last_frame is not None:
+            subscription.queue.put_nowait(self._last_frame)
+        else:
+            self.notify()
+        return subscription
+
+    def unsubscribe(self, subscription: StatsSubscription):
+        self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def stream(self, subscription: StatsSubscription):
+        """Yield server-sent event frames until the subscriber goes away"""
+        try:
+            yield f"retry: {self.min_interval_ms * 5}\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(subscription)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+
+            if not self._subscribers:
+                continue
+
+            try:
+                stats = await self._loader()
+                self._publish(f"event: stats\ndata: {json.dumps(stats.model_dump())}\n\n")
+            except Exception as e:
+                logger.error(f"Failed to broadcast petition stats: {str(e)}")
+
+            # At most one frame per interval; notifications that arrive in
+            # the meantime are folded into the next frame.
+            await asyncio.sleep(self.min_interval_ms / 1000)
+
+    def _publish(self, frame: str):
+        if frame == self._last_frame:
+            return
+        self._last_frame = frame
+
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(frame)
+                self.frames_sent += 1
+            except asyncio.QueueFull:
+                # Slow consumer: drop the connection rather than buffer for it
+                subscription.dropped = True
+                self._subscribers.discard(subscription)
+                subscription.close()
+                self.slow_consumers_dropped += 1
+
+    def get_metrics(self) -> dict:
+        return {
+            'subscribers': self.subscriber_count,
+            'frames_sent': self.frames_sent,
+            'slow_consumers_dropped': self.slow_consumers_dropped,
+            'min_interval_ms': self.min_interval_ms,
+            'heartbeat_seconds': self.heartbeat_seconds
+        }
+
+
+# Global broadcaster shared by every stream connection in this process
+stats_broadcaster = StatsBroadcaster(
+    min_interval_ms=int(os.getenv('STATS_STREAM_INTERVAL_MS', '1000')),
+    heartbeat_seconds=float(os.getenv('STATS_STREAM_HEARTBEAT_SECONDS', '15')),
+    queue_size=int(os.getenv('STATS_STREAM_QUEUE_SIZE', '8')),
+    poll_seconds=float(os.getenv('STATS_STREAM_POLL_SECONDS', '5'))
+)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+class StatsCache:
+    """Process-level TTL cache for a single value with single-flight refresh"""
+
+    def __init__(self, ttl_seconds: float = 2.0):
+        self.ttl_seconds = ttl_seconds
+        self._value: Optional[Any] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        # The load every current miss is waiting on
+        self._in_flight: Optional[asyncio.Future] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _is_fresh(self) -> bool:
+        return self._value is not None and time.monotonic() < self._expires_at
+
+    async def get(self, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, calling loader at most once per refresh
+
+        Misses share one in-flight load and all get its result, even if the
+        cache is invalidated meanwhile; only reads that start after the
+        invalidation trigger a new load. The load runs in its own task, so a
+        cancelled caller does not fail the others.
+        """
+        if self._is_fresh():
+            self.hits += 1
+            return self._value
+
+        if self._in_flight is None:
+            self.misses += 1
+            self._in_flight = asyncio.ensure_future(self._load(loader, self._generation))
+            self._in_flight.add_done_callback(self._load_done)
+        else:
+            self.hits += 1
+        return await asyncio.shield(self._in_flight)
+
+    async def _load(self, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        value = await loader()
+        # Don't store a value that was loaded before an invalidation
+        if generation == self._generation and self.ttl_seconds > 0:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl_seconds
+        return value
+
+    def _load_done(self, load: asyncio.Future):
+        if self._in_flight is load:
+            self._in_flight = None
+        if not load.cancelled():
+            # Retrieved here in case every waiter was cancelled
+            load.exception()
+
+    def invalidate(self):
+        """Drop the cached value so the next read reloads it"""
+        self._generation += 1
+        # Reads from now on must not join a load that may predate the change
+        self._in_flight = None
+        self._value = None
+        self._expires_at = 0.0
+        self.invalidations += 1
+
+    def get_metrics(self) -> dict:
+        """Hit/miss counters for sizing the TTL"""
+        lookups = self.hits + self.misses
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global stats cache shared by every SignatureService in this process
+petition_stats_cache = StatsCache(ttl_seconds=float(os.getenv('STATS_CACHE_TTL_SECONDS', '2')))
+
+
+class CountCache:
+    """Short-TTL cache of count results keyed by query"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[0]:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: int):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_metrics(self) -> dict:
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# Exact counts for filtered admin listings
+signature_count_cache = CountCache(ttl_seconds=float(os.getenv('ADMIN_COUNT_CACHE_TTL_SECONDS', '30')))
@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+mongomock_motor = pytest.importorskip('mongomock_motor')
+
+from routers.admin import _build_signature_query, _get_signatures_by_cursor
+
+BASE = datetime(2025, 11, 3, 10, 0)
+
+
+def make_db(docs):
+    db = mongomock_motor.AsyncMongoMockClient()['petition']
+    asyncio.run(db.signatures.insert_many([dict(doc) for doc in docs]))
+    return db
+
+
+def signatures(count, same_time_every=1):
+    # Groups of `same_time_every` rows share a timestamp to exercise the id tiebreak
+    return [
+        {'id': f'sig-{n:03d}', 'name': f'Signer {n}', 'timestamp': BASE + timedelta(minutes=n // same_time_every)}
+        for n in range(count)
+    ]
+
+
+def page(db, limit, cursor=None, query=None):
+    return asyncio.run(_get_signatures_by_cursor(db, query or {}, limit, cursor, False))
+
+
+def ids(result):
+    return [signature['id'] for signature in result['signatures']]
+
+
+def walk_forward(db, limit, query=None):
+    seen, result = [], page(db, limit, query=query)
+    seen.extend(ids(result))
+    while result['next_cursor']:
+        result = page(db, limit, result['next_cursor'], query)
+        seen.extend(ids(result))
+    return seen
+
+
+def newest_first(docs):
+    return [doc['id'] for doc in sorted(docs, key=lambda d: (d['timestamp'], d['id']), reverse=True)]
+
+
+def test_equal_timestamps_across_page_boundaries():
+    # Ten rows per timestamp with a page size of 3, so most boundaries split a tie
+    docs = signatures(25, same_time_every=10)
+    db = make_db(docs)
+    assert walk_forward(db, 3) == newest_first(docs)
+
+
+def test_single_timestamp_for_every_row():
+    docs = [dict(doc, timestamp=BASE) for doc in signatures(7)]
+    db = make_db(docs)
+    assert walk_forward(db, 2) == newest_first(docs)
+
+
+def test_first_and_last_pages_have_no_outward_cursor():
+    db = make_db(signatures(4))
+    first = page(db, 2)
+    assert first['prev_cursor'] is None and first['next_cursor']
+    last = page(db, 2, first['next_cursor'])
+    assert last['next_cursor'] is None and last['prev_cursor']
+
+
+def test_paging_backward_returns_previous_pages():
+    docs = signatures(10, same_time_every=4)
+    db = make_db(docs)
+    pages = [page(db, 3)]
+    while pages[-1]['next_cursor']:
+        pages.append(page(db, 3, pages[-1]['next_cursor']))
+
+    # Walk back from the last page and compare against the forward walk
+    current = pages[-1]
+    for expected in reversed(pages[:-1]):
+        current = page(db, 3, current['prev_cursor'])
+        assert ids(current) == ids(expected)
+    assert current['prev_cursor'] is None
+
+
+def test_next_after_prev_resumes_forward():
+    db = make_db(signatures(9, same_time_every=3))
+    first = page(db, 3)
+    second = page(db, 3, first['next_cursor'])
+    back = page(db, 3, second['prev_cursor'])
+    assert ids(page(db, 3, back['next_cursor'])) == ids(second)
+
+
+def encode(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-base64!',
+    base64.urlsafe_b64encode(b'not json').decode(),
+    encode({'t': BASE.isoformat(), 'i': 'sig-001'}),
+    encode({'t': 'yesterday', 'i': 'sig-001', 'd': 'next'}),
+    encode({'t': BASE.isoformat(), 'i': 'sig-001', 'd': 'sideways'}),
+    encode({'t': BASE.isoformat(), 'i': {'$gt': ''}, 'd': 'next'}),
+    encode(['next']),
+])
+def test_invalid_or_tampered_cursor_is_400(cursor):
+    db = make_db(signatures(3))
+    with pytest.raises(HTTPException) as exc:
+        page(db, 2, cursor)
+    assert exc.value.status_code == 400
+
+
+def test_filters_apply_on_every_cursor_page():
+    docs = signatures(30, same_time_every=5)
+    db = make_db(docs)
+    date_from = (BASE + timedelta(minutes=1)).isoformat()
+    date_to = (BASE + timedelta(minutes=4)).isoformat()
+    query = _build_signature_query(None, date_from, date_to)
+
+    expected = newest_first([doc for doc in docs if BASE + timedelta(minutes=1) <= doc['timestamp'] <= BASE + timedelta(minutes=4)])
+    assert walk_forward(db, 4, query) == expected
+
+    # The keyset is combined with the filter, so stepping back stays in range too
+    first = page(db, 4, query=query)
+    second = page(db, 4, first['next_cursor'], query)
+    assert ids(page(db, 4, second['prev_cursor'], query)) == ids(first)
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from services.artifact_cache import ArtifactCache
+
+
+class Render:
+    """Counts renders and blocks each one until released"""
+
+    def __init__(self, content: bytes = b'%PDF certificate'):
+        self.content = content
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        await self.release.wait()
+        return self.content
+
+
+def read(artifact) -> bytes:
+    return artifact.content if artifact.content is not None else artifact.path.read_bytes()
+
+
+def test_concurrent_requests_share_one_render(tmp_path):
+    async def scenario():
+        cache, render = ArtifactCache(str(tmp_path)), Render()
+        requests = [asyncio.create_task(cache.get_or_render('sig', '1', 'pdf', render)) for _ in range(20)]
+        await asyncio.sleep(0)
+        render.release.set()
+        artifacts = await asyncio.gather(*requests)
+        assert render.calls == 1
+        assert {read(artifact) for artifact in artifacts} == {render.content}
+        assert cache.coalesced == 19
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_does_not_fail_coalesced_requests(tmp_path):
+    async def scenario():
+        cache, render = ArtifactCache(str(tmp_path)), Render()
+        leader = asyncio.create_task(cache.get_or_render('sig', '1', 'pdf', render))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_render('sig', '1', 'pdf', render)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        # The leader's client disconnects mid-render
+        leader.cancel()
+        render.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert [read(artifact) for artifact in await asyncio.gather(*waiters)] == [render.content] * 3
+        assert render.calls == 1
+
+        # The render still completed and was cached
+        await cache.get_or_render('sig', '1', 'pdf', render)
+        assert render.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_render_reaches_every_waiter_and_is_retried(tmp_path):
+    async def scenario():
+        cache = ArtifactCache(str(tmp_path))
+        calls = []
+
+        async def failing() -> bytes:
+            calls.append(1)
+            await asyncio.sleep(0)
+            raise RuntimeError("render worker crashed")
+
+        results = await asyncio.gather(*(cache.get_or_render('sig', '1', 'pdf', failing) for _ in range(4)), return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        render = Render()
+        render.release.set()
+        assert read(await cache.get_or_render('sig', '1', 'pdf', render)) == render.content
+
+    asyncio.run(scenario())
+
+
+def test_disk_tier_serves_after_memory_is_dropped(tmp_path):
+    async def scenario():
+        render = Render()
+        render.release.set()
+        await ArtifactCache(str(tmp_path)).get_or_render('sig', '1', 'pdf', render)
+
+        # A fresh process (empty memory tier) finds it on disk
+        other = ArtifactCache(str(tmp_path))
+        artifact = await other.get_or_render('sig', '1', 'pdf', render)
+        assert artifact.path is not None and read(artifact) == render.content
+        assert render.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_disk_tier_is_pruned_to_budget(tmp_path):
+    async def scenario():
+        cache = ArtifactCache(str(tmp_path), max_disk_bytes=10_000)
+        for i in range(30):
+            render = Render(b'x' * 1000)
+            render.release.set()
+            await cache.get_or_render(f'sig{i}', '1', 'pdf', render)
+        assert cache.get_metrics()['disk_bytes'] <= 10_000
+        assert cache.disk_pruned > 0
+        assert cache.lookup('sig29', '1', 'pdf') is not None
+
+    asyncio.run(scenario())
+
+
+def test_evict_signature_removes_both_tiers(tmp_path):
+    async def scenario():
+        cache, render = ArtifactCache(str(tmp_path)), Render()
+        render.release.set()
+        await cache.get_or_render('sig', '1', 'pdf', render)
+        await cache.evict_signature('sig')
+        assert cache.lookup('sig', '1', 'pdf') is None
+
+    asyncio.run(scenario())
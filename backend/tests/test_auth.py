@@ -0,0 +1,33 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip('jwt')
+
+from middleware.auth import AdminAuthManager
+
+
+@pytest.fixture
+def jwt_auth(monkeypatch):
+    monkeypatch.setenv('ADMIN_JWT_SECRET', 'test-secret')
+    monkeypatch.delenv('ADMIN_TOKEN_MODE', raising=False)
+    return AdminAuthManager()
+
+
+def test_revoked_expiry_is_naive_utc(jwt_auth):
+    token = jwt_auth.generate_token()
+    claims = jwt_auth._decode(token)
+    asyncio.run(jwt_auth.revoke_token(token))
+
+    expires_at = jwt_auth.revoked[claims['jti']]
+    assert expires_at.tzinfo is None
+    assert expires_at == datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+    assert not jwt_auth.verify_token(token)
+
+
+def test_revocation_is_kept_until_expiry(jwt_auth):
+    token = jwt_auth.generate_token()
+    asyncio.run(jwt_auth.revoke_token(token))
+    jwt_auth._prune_revocations()
+    assert len(jwt_auth.revoked) == 1
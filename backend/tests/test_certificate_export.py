@@ -0,0 +1,46 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+
+from services import certificate_export
+
+
+class Documents:
+    def __init__(self, prefix: str, count: int):
+        self.docs = [
+            {'id': f'{prefix}{i}', 'name': 'Asha Rao', 'phone': '+91 98765 43210', 'signature_number': i + 1, 'timestamp': datetime(2025, 11, 3)}
+            for i in range(count)
+        ]
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+def test_exports_share_the_render_slots(monkeypatch):
+    in_flight, peak = 0, 0
+
+    async def render(signature) -> bytes:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return signature.id.encode()
+
+    async def scenario():
+        monkeypatch.setattr(certificate_export, '_export_render_slots', asyncio.Semaphore(1))
+        monkeypatch.setitem(certificate_export.CERTIFICATE_FORMATS, 'pdf', ('test', render))
+
+        async def export(prefix: str) -> bytes:
+            stream = certificate_export.stream_certificates_zip(Documents(prefix, 5), 'pdf', concurrency=4)
+            return b''.join([chunk async for chunk in stream])
+
+        archives = await asyncio.gather(export('a'), export('b'))
+        for archive in archives:
+            assert len(zipfile.ZipFile(io.BytesIO(archive)).namelist()) == 5
+
+    asyncio.run(scenario())
+    assert peak == 1
+
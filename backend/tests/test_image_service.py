@@ -0,0 +1,37 @@
+import hashlib
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from PIL import Image
+
+from services.image_service import FONT_DIR, ImageService
+
+# SHA-256 of the RGB pixels that the single-pass renderer (before the static
+# layer was cached) produced for these signers with the DejaVu fonts
+BASELINE_PIXELS = [
+    (SimpleNamespace(signature_number=12847, timestamp=datetime(2025, 11, 3, 10, 0), name='Asha Rao', phone='+91 98765 43210'),
+     '7309789a39f2ca3251548c06e4f9c70eb76e99f47b229d1ac15070ffc3c0997c'),
+    (SimpleNamespace(signature_number=1, timestamp=datetime(2026, 1, 1), name='José Müller-Ñúñez', phone='+1 555 0100'),
+     'fc89136981573f47de454808f05ecbded08fb0bc7379a927a6ec28a5ead775fa'),
+]
+
+
+def pixels(png) -> str:
+    return hashlib.sha256(Image.open(png).convert('RGB').tobytes()).hexdigest()
+
+
+@pytest.mark.skipif(not os.path.exists(f"{FONT_DIR}/DejaVuSans.ttf"), reason="DejaVu fonts not installed")
+@pytest.mark.parametrize('signature, expected', BASELINE_PIXELS)
+def test_matches_single_pass_baseline(signature, expected):
+    assert pixels(ImageService.generate_petition_image(signature)) == expected
+
+
+def test_template_is_not_modified_by_renders():
+    first = pixels(ImageService.generate_petition_image(BASELINE_PIXELS[0][0]))
+    ImageService.generate_petition_image(BASELINE_PIXELS[1][0])
+    assert pixels(ImageService.generate_petition_image(BASELINE_PIXELS[0][0])) == first
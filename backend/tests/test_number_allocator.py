@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip('mongomock_motor')
+
+from services.number_allocator import BLOCKS_DOCUMENT_ID, SignatureNumberAllocator
+
+
+def counters_collection():
+    return mongomock_motor.AsyncMongoMockClient()['petition']['counters']
+
+
+def test_numbers_cross_block_boundaries_without_gaps():
+    async def scenario():
+        counters = counters_collection()
+        allocator = SignatureNumberAllocator(enabled=True, block_size=10)
+        await allocator.start(counters)
+        numbers = []
+        for count in (3, 4, 5, 1, 9):
+            numbers.extend(await allocator.allocate(count))
+        await allocator.stop()
+        return numbers
+
+    assert asyncio.run(scenario()) == list(range(1, 23))
+
+
+def test_concurrent_allocators_never_share_a_number():
+    async def scenario():
+        counters = counters_collection()
+        allocators = [SignatureNumberAllocator(enabled=True, block_size=7) for _ in range(3)]
+        for allocator in allocators:
+            await allocator.start(counters)
+
+        batches = await asyncio.gather(*[
+            allocator.allocate(1) for _ in range(40) for allocator in allocators
+        ])
+        for allocator in allocators:
+            await allocator.stop()
+        return [n for batch in batches for n in batch], await counters.find_one({'_id': BLOCKS_DOCUMENT_ID})
+
+    numbers, blocks = asyncio.run(scenario())
+    assert len(numbers) == len(set(numbers)) == 120
+    # Every reserved number was either issued or reported as a gap
+    assert blocks['reserved'] == len(numbers) + blocks['abandoned']
+
+
+def test_next_block_is_prefetched_below_threshold():
+    async def scenario():
+        counters = counters_collection()
+        allocator = SignatureNumberAllocator(enabled=True, block_size=10, refill_threshold=0.2)
+        await allocator.start(counters)
+        await allocator.allocate(7)
+        no_prefetch = allocator._prefetch is None
+        await allocator.allocate(1)
+        prefetching = allocator._prefetch is not None
+        await asyncio.sleep(0)
+        numbers = await allocator.allocate(4)
+        await allocator.stop()
+        return no_prefetch, prefetching, numbers, allocator.blocks_reserved
+
+    no_prefetch, prefetching, numbers, blocks_reserved = asyncio.run(scenario())
+    assert no_prefetch and prefetching
+    assert numbers == [9, 10, 11, 12]
+    assert blocks_reserved == 2
+
+
+def test_failed_prefetch_falls_back_to_direct_reservation():
+    async def scenario():
+        counters = counters_collection()
+        # A negative threshold never prefetches on its own
+        allocator = SignatureNumberAllocator(enabled=True, block_size=5, refill_threshold=-1)
+        await allocator.start(counters)
+        await allocator.allocate(5)
+
+        async def fail():
+            raise RuntimeError('primary stepped down')
+        allocator._prefetch = asyncio.ensure_future(fail())
+        numbers = await allocator.allocate(2)
+        await allocator.stop()
+        return numbers
+
+    assert asyncio.run(scenario()) == [6, 7]
+
+
+def test_start_reserves_above_numbers_already_issued():
+    async def scenario():
+        counters = counters_collection()
+        await counters.insert_one({'_id': 'signature_counter', 'count': 500})
+        allocator = SignatureNumberAllocator(enabled=True, block_size=10)
+        await allocator.start(counters)
+        numbers = await allocator.allocate(2)
+        await allocator.stop()
+        return numbers
+
+    assert asyncio.run(scenario()) == [501, 502]
+
+
+def test_stop_reports_unused_numbers_as_abandoned():
+    async def scenario():
+        counters = counters_collection()
+        allocator = SignatureNumberAllocator(enabled=True, block_size=10, refill_threshold=0.5)
+        await allocator.start(counters)
+        await allocator.allocate(6)
+        await allocator.stop()
+        return allocator, await allocator.get_gap_report()
+
+    allocator, report = asyncio.run(scenario())
+    # 4 left in the current block plus the whole prefetched one
+    assert report == {'reserved': 20, 'abandoned': 14}
+    assert allocator.numbers_abandoned == 14
+    assert allocator.get_metrics()['numbers_remaining_in_block'] == 0
+
+
+def test_disabled_mode_moves_counter_above_block_reservations():
+    async def scenario():
+        counters = counters_collection()
+        await counters.insert_one({'_id': 'signature_counter', 'count': 120})
+        await counters.insert_one({'_id': BLOCKS_DOCUMENT_ID, 'reserved': 300, 'abandoned': 30})
+        await SignatureNumberAllocator(enabled=False).start(counters)
+        return await counters.find_one({'_id': 'signature_counter'})
+
+    assert asyncio.run(scenario())['count'] == 300
+
+
+def test_recorded_signatures_are_flushed_to_the_counter():
+    async def scenario():
+        counters = counters_collection()
+        await counters.insert_one({'_id': 'signature_counter', 'count': 0})
+        flushed = []
+        allocator = SignatureNumberAllocator(enabled=True, count_flush_ms=10)
+        await allocator.start(counters, on_count_flushed=lambda: flushed.append(True))
+        allocator.record_signed(3)
+        allocator.record_signed(2)
+        await asyncio.sleep(0.05)
+        allocator.record_signed(1)
+        await allocator.stop()
+        return await counters.find_one({'_id': 'signature_counter'}), flushed
+
+    counter, flushed = asyncio.run(scenario())
+    assert counter['count'] == 6
+    assert len(flushed) == 2
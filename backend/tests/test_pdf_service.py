@@ -0,0 +1,45 @@
+import base64
+import re
+import zlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('reportlab')
+
+from services.pdf_service import PDFService
+
+
+def page_contents(pdf: bytes) -> list:
+    """Decoded page content streams (what is drawn, without document metadata)"""
+    streams = re.findall(rb'stream\r?\n(.*?)endstream', pdf, re.S)
+    return [zlib.decompress(base64.a85decode(stream.strip(), adobe=True)) for stream in streams]
+
+
+def signer(name: str = 'Asha Rao', phone: str = '+91 98765 43210', number: int = 12847):
+    return SimpleNamespace(signature_number=number, timestamp=datetime(2025, 11, 3, 10, 0), name=name, phone=phone)
+
+
+@pytest.mark.parametrize('signature', [
+    signer(),
+    signer(name='José Müller-Ñúñez', number=1),
+    signer(name='A' * 100, phone='+1 555 0100', number=999999),
+])
+def test_template_matches_full_layout(signature):
+    template = PDFService.generate_petition_pdf_from_template(signature)
+    full = PDFService.generate_petition_pdf_full(signature)
+    assert template is not None
+    assert page_contents(template.getvalue()) == page_contents(full.getvalue())
+
+
+def test_template_output_is_deterministic():
+    first = PDFService.generate_petition_pdf_from_template(signer()).getvalue()
+    assert PDFService.generate_petition_pdf_from_template(signer()).getvalue() == first
+
+
+def test_taller_table_falls_back_to_full_layout():
+    signature = signer(name='Asha\nRao')
+    assert PDFService.generate_petition_pdf_from_template(signature) is None
+    rendered = PDFService.generate_petition_pdf(signature)
+    assert page_contents(rendered.getvalue()) == page_contents(PDFService.generate_petition_pdf_full(signature).getvalue())
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models.signature import Signature
+from routers.petition import router
+from services.signature_service import get_signature_service
+
+
+class FakeSignatureService:
+    def __init__(self, signatures: dict):
+        self.signatures = signatures
+
+    async def get_signature(self, signature_id: str, validate: bool = True):
+        return self.signatures.get(signature_id)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router, prefix='/api')
+    signature = Signature(id='abc', name='Asha Rao', phone='+91 98765 43210', signature_number=12848, timestamp=datetime(2025, 11, 3, 10, 0))
+    app.dependency_overrides[get_signature_service] = lambda: FakeSignatureService({'abc': signature})
+    return TestClient(app)
+
+
+def test_signature_service_is_injected(client):
+    response = client.get('/api/petition/signature/abc')
+    assert response.status_code == 200
+    assert response.json()['signature_number'] == 12848
+
+
+def test_missing_signature_is_404(client):
+    assert client.get('/api/petition/signature/nope').status_code == 404
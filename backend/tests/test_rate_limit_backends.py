@@ -0,0 +1,29 @@
+import pytest
+
+from middleware.rate_limit_backends import MemoryBackend, RateLimitBackend, create_backend
+
+
+def test_backend_must_implement_counters():
+    class Incomplete(RateLimitBackend):
+        async def incr(self, key, window, window_seconds):
+            return 1, 0
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_create_memory_backend():
+    backend = create_backend('memory', 'api', max_identities=10)
+    assert isinstance(backend, MemoryBackend)
+    assert backend.max_identities == 10
+
+
+@pytest.mark.parametrize('kind', ['', 'redis', 'Memory', 'shared-memory'])
+def test_unknown_backend_is_rejected(kind):
+    with pytest.raises(ValueError, match='Unknown rate limit backend'):
+        create_backend(kind, 'api')
+
+
+def test_mongo_backend_needs_a_database():
+    with pytest.raises(ValueError):
+        create_backend('mongo', 'api')
@@ -0,0 +1,130 @@
+import asyncio
+import ipaddress
+
+import pytest
+from starlette.requests import Request
+
+from middleware import rate_limiter
+from middleware.rate_limiter import RateLimiter, get_client_identifier
+
+
+def make_request(peer: str, forwarded: str = None) -> Request:
+    headers = [(b'x-forwarded-for', forwarded.encode())] if forwarded is not None else []
+    return Request({'type': 'http', 'headers': headers, 'client': (peer, 4321)})
+
+
+@pytest.fixture
+def trust_all(monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'TRUST_ALL_PROXIES', True)
+    monkeypatch.setattr(rate_limiter, 'TRUSTED_PROXY_NETWORKS', [])
+    monkeypatch.setattr(rate_limiter, 'TRUSTED_HOPS', 1)
+
+
+@pytest.fixture
+def trust_private(monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'TRUST_ALL_PROXIES', False)
+    monkeypatch.setattr(rate_limiter, 'TRUSTED_PROXY_NETWORKS', [ipaddress.ip_network('10.0.0.0/8')])
+
+
+def test_untrusted_peer_ignores_forwarded_header(monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'TRUST_ALL_PROXIES', False)
+    monkeypatch.setattr(rate_limiter, 'TRUSTED_PROXY_NETWORKS', [])
+    assert get_client_identifier(make_request('203.0.113.9', '1.1.1.1')) == '203.0.113.9'
+
+
+def test_trust_all_uses_right_most_entry(trust_all):
+    assert get_client_identifier(make_request('10.0.0.1', '198.51.100.7')) == '198.51.100.7'
+
+
+def test_trust_all_ignores_spoofed_left_entries(trust_all):
+    for spoofed in ('1.1.1.1', '2.2.2.2', '3.3.3.3'):
+        request = make_request('10.0.0.1', f"{spoofed}, 198.51.100.7")
+        assert get_client_identifier(request) == '198.51.100.7'
+
+
+def test_trust_all_with_more_hops(trust_all, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'TRUSTED_HOPS', 2)
+    request = make_request('10.0.0.1', '1.1.1.1, 198.51.100.7, 172.16.0.3')
+    assert get_client_identifier(request) == '198.51.100.7'
+    # Fewer entries than proxies: nothing trustworthy, use the peer
+    assert get_client_identifier(make_request('10.0.0.1', '198.51.100.7')) == '10.0.0.1'
+
+
+def test_trusted_networks_skip_proxies_from_the_right(trust_private):
+    request = make_request('10.0.0.1', '1.1.1.1, 198.51.100.7, 10.0.0.2')
+    assert get_client_identifier(request) == '198.51.100.7'
+
+
+def test_trusted_networks_never_fall_back_to_left_most(trust_private):
+    # Every entry looks like one of our proxies: the left-most may be forged
+    assert get_client_identifier(make_request('10.0.0.1', '10.9.9.9, 10.0.0.2')) == '10.0.0.1'
+
+
+@pytest.mark.parametrize('forwarded', ['', 'not-an-ip', '198.51.100.7, <script>', ' , ,'])
+def test_garbage_forwarded_header_falls_back_to_peer(trust_all, forwarded):
+    assert get_client_identifier(make_request('10.0.0.1', forwarded)) == '10.0.0.1'
+
+
+def test_missing_forwarded_header_uses_peer(trust_all):
+    assert get_client_identifier(make_request('10.0.0.1')) == '10.0.0.1'
+
+
+def test_forwarded_address_is_normalized(trust_all):
+    assert get_client_identifier(make_request('10.0.0.1', '2001:DB8:0:0::1')) == '2001:db8::1'
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(1_000_000.0)
+    monkeypatch.setattr(rate_limiter.time, 'time', fake)
+    return fake
+
+
+def attempts(limiter: RateLimiter, count: int, identifier: str = 'client') -> list:
+    async def run():
+        return [await limiter.check_rate_limit(identifier) for _ in range(count)]
+    return asyncio.run(run())
+
+
+def test_allows_max_requests_per_window(clock):
+    limiter = RateLimiter(max_requests=4, window_seconds=10)
+    assert attempts(limiter, 5) == [True, True, True, True, False]
+
+
+def test_rejected_attempts_do_not_use_quota(clock):
+    limiter = RateLimiter(max_requests=2, window_seconds=10)
+    assert attempts(limiter, 10) == [True, True] + [False] * 8
+
+    # Half of the previous window still counts: 2 * 0.5 = 1, so one more fits
+    clock.now += 15
+    assert attempts(limiter, 2) == [True, False]
+
+
+def test_previous_window_is_weighted_by_overlap(clock):
+    limiter = RateLimiter(max_requests=4, window_seconds=10)
+    assert all(attempts(limiter, 4))
+
+    # 25% into the next window, 75% of the previous count still applies
+    clock.now += 12.5
+    assert attempts(limiter, 2) == [True, False]
+
+
+def test_quota_resets_after_two_windows(clock):
+    limiter = RateLimiter(max_requests=3, window_seconds=10)
+    assert attempts(limiter, 4) == [True, True, True, False]
+    clock.now += 20
+    assert attempts(limiter, 4) == [True, True, True, False]
+
+
+def test_identities_are_counted_separately(clock):
+    limiter = RateLimiter(max_requests=1, window_seconds=10)
+    assert attempts(limiter, 2, 'a') == [True, False]
+    assert attempts(limiter, 2, 'b') == [True, False]
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+mongomock_motor = pytest.importorskip('mongomock_motor')
+
+from services import rollup_service
+from services.rollup_service import RollupService, day_key, hour_key
+
+
+@pytest.fixture(autouse=True)
+def kolkata(monkeypatch):
+    # IST is UTC+05:30, so the local day starts at 18:30 UTC
+    monkeypatch.setattr(rollup_service, 'STATS_TIMEZONE', ZoneInfo('Asia/Kolkata'))
+
+
+def make_service():
+    return RollupService(mongomock_motor.AsyncMongoMockClient()['petition'])
+
+
+def test_local_day_starts_at_1830_utc():
+    assert day_key(datetime(2025, 11, 3, 18, 29, 59)) == 'day:2025-11-03'
+    assert day_key(datetime(2025, 11, 3, 18, 30)) == 'day:2025-11-04'
+    assert hour_key(datetime(2025, 11, 3, 18, 29, 59)) == 'hour:2025-11-03T23'
+    assert hour_key(datetime(2025, 11, 3, 18, 30)) == 'hour:2025-11-04T00'
+
+
+def test_hours_follow_the_half_hour_offset():
+    assert hour_key(datetime(2025, 11, 3, 4, 29)) == 'hour:2025-11-03T09'
+    assert hour_key(datetime(2025, 11, 3, 4, 30)) == 'hour:2025-11-03T10'
+
+
+def test_month_and_year_rollover():
+    assert day_key(datetime(2025, 12, 31, 18, 30)) == 'day:2026-01-01'
+    assert hour_key(datetime(2025, 11, 30, 18, 45)) == 'hour:2025-12-01T00'
+
+
+def test_naive_and_aware_timestamps_agree():
+    naive = datetime(2025, 11, 3, 20, 15)
+    aware = naive.replace(tzinfo=timezone.utc).astimezone(ZoneInfo('America/New_York'))
+    assert hour_key(aware) == hour_key(naive)
+    assert day_key(aware) == day_key(naive)
+
+
+def test_bucket_ids_sort_chronologically():
+    start = datetime(2025, 12, 31, 12, 0)
+    stamps = [start + timedelta(minutes=37 * n) for n in range(100)]
+    hours = [hour_key(stamp) for stamp in stamps]
+    days = [day_key(stamp) for stamp in stamps]
+    assert hours == sorted(hours)
+    assert days == sorted(days)
+
+
+def test_record_counts_each_bucket_and_applies_deletes():
+    async def scenario():
+        service = make_service()
+        await service.record([
+            datetime(2025, 11, 3, 18, 0),
+            datetime(2025, 11, 3, 18, 29),
+            datetime(2025, 11, 3, 18, 30),
+        ])
+        await service.record([datetime(2025, 11, 3, 18, 29)], delta=-1)
+        return {doc['_id']: doc['count'] async for doc in service.rollups_collection.find({})}
+
+    assert asyncio.run(scenario()) == {
+        'total': 2,
+        'day:2025-11-03': 1,
+        'day:2025-11-04': 1,
+        'hour:2025-11-03T23': 1,
+        'hour:2025-11-04T00': 1,
+    }
+
+
+def test_rebuild_matches_incremental_counts():
+    stamps = [datetime(2025, 11, 1, 0, 0) + timedelta(minutes=53 * n) for n in range(200)]
+
+    async def scenario():
+        recorded = make_service()
+        await recorded.record(stamps)
+        rebuilt = make_service()
+        await rebuilt.signatures_collection.insert_many([{'timestamp': stamp} for stamp in stamps])
+        # A stale bucket that no signature backs any more
+        await rebuilt.rollups_collection.insert_one({'_id': 'day:2020-01-01', 'count': 4})
+        summary = await rebuilt.rebuild()
+
+        async def buckets(service):
+            return {doc['_id']: doc['count'] async for doc in service.rollups_collection.find({'_id': {'$ne': 'build'}})}
+        return summary, await recorded.rollups_collection.find_one({'_id': 'total'}), await buckets(recorded), await buckets(rebuilt)
+
+    summary, total, recorded, rebuilt = asyncio.run(scenario())
+    assert rebuilt == recorded
+    assert summary['total'] == total['count'] == 200
+    assert summary['removed'] == 1
+
+
+def test_admin_stats_use_the_local_calendar():
+    async def scenario():
+        service = make_service()
+        await service.record([
+            datetime(2025, 11, 2, 18, 29),  # Sunday 23:59 IST, last week
+            datetime(2025, 11, 2, 18, 30),  # Monday 00:00 IST
+            datetime(2025, 11, 4, 18, 29),  # Tuesday 23:59 IST
+            datetime(2025, 11, 4, 18, 30),  # Wednesday 00:00 IST, "today"
+            datetime(2025, 10, 31, 18, 29),  # Oct 31 IST, last month
+        ])
+        # 19:00 UTC on Tuesday is already Wednesday 00:30 in Kolkata
+        return await service.get_admin_stats(now=datetime(2025, 11, 4, 19, 0))
+
+    stats = asyncio.run(scenario())
+    assert stats['today'] == 1
+    assert stats['this_week'] == 3
+    assert stats['this_month'] == 4
+    assert stats['total_signatures'] == 5
+    assert [day['_id'] for day in stats['daily_trend']] == ['2025-10-31', '2025-11-02', '2025-11-03', '2025-11-04', '2025-11-05']
+    assert stats['timezone'] == 'Asia/Kolkata'
+
+
+def test_hourly_trend_crosses_local_midnight():
+    async def scenario():
+        service = make_service()
+        await service.record([
+            datetime(2025, 11, 3, 16, 30),  # 22:00 IST, outside a 2 hour window
+            datetime(2025, 11, 3, 18, 0),   # 23:30 IST
+            datetime(2025, 11, 3, 18, 45),  # 00:15 IST next day
+        ])
+        return await service.get_hourly_trend(hours=2, now=datetime(2025, 11, 3, 18, 50))
+
+    assert asyncio.run(scenario()) == [
+        {'_id': '2025-11-03T23', 'count': 1},
+        {'_id': '2025-11-04T00', 'count': 1},
+    ]
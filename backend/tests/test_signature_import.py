@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from models.signature import Signature
+from services.signature_import import (
+    LineTooLong,
+    SignatureImporter,
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson_records,
+)
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+def csv_records(data: bytes, **kwargs) -> list:
+    return asyncio.run(collect(iter_csv_records(iter_lines(chunked(data), **kwargs), **kwargs)))
+
+
+def ndjson_records(data: bytes) -> list:
+    return asyncio.run(collect(iter_ndjson_records(iter_lines(chunked(data)))))
+
+
+def test_lines_split_across_chunks_and_crlf():
+    lines = asyncio.run(collect(iter_lines(chunked(b'one\r\ntwo\nthree'))))
+    assert lines == ['one', 'two', 'three']
+
+
+def test_multibyte_characters_split_across_chunks():
+    data = 'José Müller\n'.encode()
+    lines = asyncio.run(collect(iter_lines(chunked(data, size=1))))
+    assert lines == ['José Müller']
+
+
+def test_bom_is_stripped_from_header():
+    records = csv_records(b'\xef\xbb\xbfName,Phone\nAsha Rao,+91 98765 43210\n')
+    assert records == [(2, {'name': 'Asha Rao', 'phone': '+91 98765 43210'})]
+
+
+def test_quoted_newline_keeps_first_line_number():
+    records = csv_records(b'name,phone,email\n"Asha\nRao",+91 98765 43210,\nRavi,+91 98765 43211,\n')
+    assert records == [
+        (2, {'name': 'Asha\nRao', 'phone': '+91 98765 43210', 'email': ''}),
+        (4, {'name': 'Ravi', 'phone': '+91 98765 43211', 'email': ''}),
+    ]
+
+
+def test_embedded_quotes():
+    records = csv_records(b'name,phone\n"Asha ""Didi"" Rao","+91, 98765"\n')
+    assert records == [(2, {'name': 'Asha "Didi" Rao', 'phone': '+91, 98765'})]
+
+
+def test_blank_lines_are_skipped():
+    records = csv_records(b'name,phone\n\n , \nAsha,123\n')
+    assert records == [(4, {'name': 'Asha', 'phone': '123'})]
+
+
+def test_unterminated_quote_is_reported():
+    records = csv_records(b'name,phone\n"Asha,123\nRavi,456\n')
+    assert records == [(2, {'_error': "Unterminated quoted field"})]
+
+
+def test_overlong_line_stops_the_stream():
+    with pytest.raises(LineTooLong) as excinfo:
+        csv_records(b'name,phone\n' + b'x' * 100 + b',1\n', max_length=50)
+    assert excinfo.value.line_number == 2
+
+
+def test_overlong_line_without_newline_is_not_buffered():
+    with pytest.raises(LineTooLong):
+        asyncio.run(collect(iter_lines(chunked(b'x' * 100), max_length=50)))
+
+
+def test_runaway_quoted_record_stops_the_stream():
+    with pytest.raises(LineTooLong) as excinfo:
+        csv_records(b'name,phone\n"Asha,1\n' + b'Ravi,2\n' * 20, max_length=50)
+    assert excinfo.value.line_number == 2
+
+
+def test_ndjson_errors():
+    records = ndjson_records(b'{"name": "Asha"}\n\n{"name": \n[1, 2]\n"text"\n')
+    assert records[0] == (1, {'name': 'Asha'})
+    assert records[1][0] == 3 and records[1][1]['_error'].startswith('Invalid JSON')
+    assert records[2] == (4, {'_error': "Expected a JSON object"})
+    assert records[3] == (5, {'_error': "Expected a JSON object"})
+
+
+class FakeSignatureService:
+    """Hands out numbers like the counter, with live signups between batches"""
+
+    def __init__(self, live_signups_per_batch: int = 0):
+        self.next_number = 100
+        self.live_signups_per_batch = live_signups_per_batch
+
+    async def create_signatures_batch(self, batch, timestamps=None):
+        results = []
+        for signature_data in batch:
+            results.append(Signature(name=signature_data.name, phone=signature_data.phone, signature_number=self.next_number))
+            self.next_number += 1
+        self.next_number += self.live_signups_per_batch
+        return results
+
+
+def run_import(data: bytes, fmt: str, service: FakeSignatureService, batch_size: int = 2) -> dict:
+    importer = SignatureImporter(service, batch_size=batch_size)
+    return asyncio.run(importer.run(chunked(data), fmt))
+
+
+ROWS = b'name,phone\n' + b''.join(b'Signer %s,+91 98765 4321%d\n' % (name, i) for i, name in enumerate([b'Asha', b'Ravi', b'Meena', b'Kabir', b'Noor']))
+
+
+def test_report_single_range():
+    report = run_import(ROWS, 'csv', FakeSignatureService())
+    assert report['imported'] == 5
+    assert report['signature_numbers'] == [{'first': 100, 'last': 104}]
+
+
+def test_report_ranges_split_by_live_signups():
+    report = run_import(ROWS, 'csv', FakeSignatureService(live_signups_per_batch=1))
+    assert report['signature_numbers'] == [
+        {'first': 100, 'last': 101},
+        {'first': 103, 'last': 104},
+        {'first': 106, 'last': 106},
+    ]
+
+
+def test_report_row_errors():
+    data = b'{"name": "Asha Rao", "phone": "+91 98765 43210"}\n{"name": "A"}\nnot json\n'
+    report = run_import(data, 'ndjson', FakeSignatureService())
+    assert report['imported'] == 1
+    assert [error['row'] for error in report['errors']] == [2, 3]
+    assert report['stopped'] is None
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+from models.signature import PetitionStats
+from services.stats_broadcaster import StatsBroadcaster
+
+
+def frame(total: int) -> str:
+    return f"event: stats\ndata: {json.dumps({'total_signatures': total, 'recent_signatures': []})}\n\n"
+
+
+def drain(subscription):
+    frames = []
+    while not subscription.queue.empty():
+        frames.append(subscription.queue.get_nowait())
+    return frames
+
+
+def test_identical_frames_are_published_once():
+    async def scenario():
+        broadcaster = StatsBroadcaster()
+        subscription = broadcaster.subscribe()
+        for total in (1, 1, 2, 2, 2, 1):
+            broadcaster._publish(frame(total))
+        return broadcaster, drain(subscription)
+
+    broadcaster, frames = asyncio.run(scenario())
+    assert frames == [frame(1), frame(2), frame(1)]
+    assert broadcaster.frames_sent == 3
+
+
+def test_new_subscriber_gets_the_latest_frame():
+    async def scenario():
+        broadcaster = StatsBroadcaster()
+        broadcaster._publish(frame(5))
+        broadcaster._publish(frame(6))
+        return drain(broadcaster.subscribe())
+
+    assert asyncio.run(scenario()) == [frame(6)]
+
+
+def test_slow_consumer_is_dropped_without_affecting_others():
+    async def scenario():
+        broadcaster = StatsBroadcaster(queue_size=2)
+        slow = broadcaster.subscribe()
+        fast = broadcaster.subscribe()
+        received = []
+        for total in range(1, 5):
+            broadcaster._publish(frame(total))
+            received.extend(drain(fast))
+        return broadcaster, slow, fast, received, drain(slow)
+
+    broadcaster, slow, fast, received, leftover = asyncio.run(scenario())
+    assert slow.dropped and not fast.dropped
+    # The dropped queue is drained and left with only the close sentinel
+    assert leftover == [None]
+    assert received == [frame(total) for total in range(1, 5)]
+    assert broadcaster.subscriber_count == 1
+    assert broadcaster.slow_consumers_dropped == 1
+
+
+def test_stream_ends_when_dropped():
+    async def scenario():
+        broadcaster = StatsBroadcaster(queue_size=1, heartbeat_seconds=5)
+        subscription = broadcaster.subscribe()
+        broadcaster._publish(frame(1))
+        broadcaster._publish(frame(2))
+        return [chunk async for chunk in broadcaster.stream(subscription)], broadcaster.subscriber_count
+
+    chunks, subscribers = asyncio.run(asyncio.wait_for(scenario(), timeout=2))
+    assert chunks[0].startswith('retry: ')
+    assert chunks[1:] == []
+    assert subscribers == 0
+
+
+def test_stream_sends_heartbeats_while_idle():
+    async def scenario():
+        broadcaster = StatsBroadcaster(heartbeat_seconds=0.01)
+        broadcaster._publish(frame(1))
+        stream = broadcaster.stream(broadcaster.subscribe())
+        chunks = [await stream.__anext__() for _ in range(4)]
+        await stream.aclose()
+        return chunks, broadcaster.subscriber_count
+
+    chunks, subscribers = asyncio.run(scenario())
+    assert chunks[1] == frame(1)
+    assert chunks[2:] == [': heartbeat\n\n', ': heartbeat\n\n']
+    assert subscribers == 0
+
+
+def test_notification_bursts_are_coalesced():
+    async def scenario():
+        loads = 0
+
+        async def loader():
+            nonlocal loads
+            loads += 1
+            return PetitionStats(total_signatures=loads, recent_signatures=[])
+
+        broadcaster = StatsBroadcaster(min_interval_ms=50, poll_seconds=10)
+        subscription = broadcaster.subscribe()
+        broadcaster.start(loader)
+        await asyncio.sleep(0.01)
+        for _ in range(20):
+            broadcaster.notify()
+        await asyncio.sleep(0.12)
+        frames = drain(subscription)
+        await broadcaster.stop()
+        return loads, frames
+
+    loads, frames = asyncio.run(scenario())
+    # One load for subscribe(), one for the whole burst
+    assert loads == 2
+    assert frames == [frame(1), frame(2)]
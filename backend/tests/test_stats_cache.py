@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from services.stats_cache import StatsCache
+
+
+class Loader:
+    """Counts calls and blocks each load until released"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        return {'load': call}
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache, loader = StatsCache(ttl_seconds=60), Loader()
+        readers = [asyncio.create_task(cache.get(loader)) for _ in range(50)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*readers)
+        assert loader.calls == 1
+        assert results == [{'load': 1}] * 50
+        assert await cache.get(loader) == {'load': 1}
+        assert loader.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_during_load_does_not_stampede():
+    async def scenario():
+        cache, loader = StatsCache(ttl_seconds=60), Loader()
+        readers = [asyncio.create_task(cache.get(loader)) for _ in range(50)]
+        await asyncio.sleep(0)
+        cache.invalidate()
+        loader.release.set()
+        assert await asyncio.gather(*readers) == [{'load': 1}] * 50
+        assert loader.calls == 1
+
+        # The pre-invalidation result was not stored; the next wave loads once
+        wave = [asyncio.create_task(cache.get(loader)) for _ in range(50)]
+        assert await asyncio.gather(*wave) == [{'load': 2}] * 50
+        assert loader.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_reads_after_invalidate_do_not_join_the_older_load():
+    async def scenario():
+        cache, loader = StatsCache(ttl_seconds=60), Loader()
+        before = [asyncio.create_task(cache.get(loader)) for _ in range(10)]
+        await asyncio.sleep(0)
+        cache.invalidate()
+        after = [asyncio.create_task(cache.get(loader)) for _ in range(10)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        assert await asyncio.gather(*before) == [{'load': 1}] * 10
+        assert await asyncio.gather(*after) == [{'load': 2}] * 10
+        assert loader.calls == 2
+        # Only the post-invalidation load is cached
+        assert await cache.get(loader) == {'load': 2}
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_reader_does_not_fail_the_others():
+    async def scenario():
+        cache, loader = StatsCache(ttl_seconds=60), Loader()
+        leader = asyncio.create_task(cache.get(loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get(loader))
+        await asyncio.sleep(0)
+        leader.cancel()
+        loader.release.set()
+        assert await waiter == {'load': 1}
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(scenario())
+
+
+def test_failed_load_is_shared_and_retried():
+    async def scenario():
+        cache = StatsCache(ttl_seconds=60)
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0)
+            raise RuntimeError("database down")
+
+        results = await asyncio.gather(*(cache.get(failing) for _ in range(5)), return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        async def working():
+            return 'ok'
+
+        assert await cache.get(working) == 'ok'
+
+    asyncio.run(scenario())
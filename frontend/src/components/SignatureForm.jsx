@@ -5,6 +5,18 @@ import axios from 'axios';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || '';
 const API = BACKEND_URL ? `${BACKEND_URL}/api` : '/api';
 
+// Stats carry ISO timestamps (so they can be cached); show them relative to now
+const timeAgo = (timestamp) => {
+  const signedAt = Date.parse(timestamp);
+  if (Number.isNaN(signedAt)) return timestamp;
+
+  const seconds = Math.max(0, Math.floor((Date.now() - signedAt) / 1000));
+  if (seconds < 60) return `${seconds} seconds ago`;
+  if (seconds < 3600) return `${Math.floor(seconds / 60)} minutes ago`;
+  if (seconds < 86400) return `${Math.floor(seconds / 3600)} hours ago`;
+  return `${Math.floor(seconds / 86400)} days ago`;
+};
+
 const SignatureForm = ({ onSubmit, isSubmitting }) => {
   const [formData, setFormData] = useState({
     name: '',
@@ -14,6 +26,13 @@ const SignatureForm = ({ onSubmit, isSubmitting }) => {
     total_signatures: 12847,
     recent_signatures: []
   });
+  // Re-render now and then so relative times keep moving between updates
+  const [, setNow] = useState(Date.now());
+
+  useEffect(() => {
+    const ticker = setInterval(() => setNow(Date.now()), 30000);
+    return () => clearInterval(ticker);
+  }, []);
 
   useEffect(() => {
     const fetchStats = async () => {
@@ -26,9 +45,28 @@ const SignatureForm = ({ onSubmit, isSubmitting }) => {
     };
 
     fetchStats();
-    const interval = setInterval(fetchStats, 10000);
 
-    return () => clearInterval(interval);
+    // Prefer server-pushed updates; fall back to polling if the stream fails
+    let interval = null;
+    let source = null;
+    if (typeof window !== 'undefined' && window.EventSource) {
+      source = new EventSource(`${API}/petition/stats/stream`);
+      source.addEventListener('stats', (event) => {
+        setStats(JSON.parse(event.data));
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !interval) {
+          interval = setInterval(fetchStats, 10000);
+        }
+      };
+    } else {
+      interval = setInterval(fetchStats, 10000);
+    }
+
+    return () => {
+      if (source) source.close();
+      if (interval) clearInterval(interval);
+    };
   }, []);
 
   const handleChange = (e) => {
@@ -72,7 +110,7 @@ const SignatureForm = ({ onSubmit, isSubmitting }) => {
           <div className="mt-4 md:mt-6 flex flex-wrap justify-center gap-2 md:gap-3 max-w-full overflow-hidden">
             {stats.recent_signatures.slice(0, 3).map((sig, idx) => (
               <div key={idx} className="bg-white/10 px-2 md:px-4 py-1.5 md:py-2 rounded-full text-xs md:text-sm font-semibold border border-white/20 truncate max-w-full">
-                {sig.name} • {sig.timestamp}
+                {sig.name} • {timeAgo(sig.timestamp)}
               </div>
             ))}
           </div>
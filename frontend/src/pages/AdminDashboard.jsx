@@ -121,8 +121,10 @@ const AdminDashboard = () => {
       if (!authConfig) return;
       
       toast.info('Generating CSV...');
+      // Streamed and gzip-compressed on the fly; the browser inflates it
       const response = await axios.get(`${API}/admin/export-csv`, {
         ...authConfig,
+        params: { gzip: true, ...(searchTerm ? { search: searchTerm } : {}) },
         responseType: 'blob'
       });
       